@@ -1,64 +1,123 @@
 # config/settings.py
+import functools
 import os
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import List
 from dotenv import load_dotenv
 
 # Load .env from project root (../../.env relative to this file)
 env_path = Path(__file__).resolve().parent.parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
 
+
+@functools.cache
+def _load_env() -> bool:
+    """.env 파싱은 프로세스당 한 번만 (reload / worker spawn 시 재파싱 방지)"""
+    if not os.environ.get("_SETTINGS_LOADED"):
+        load_dotenv(dotenv_path=env_path)
+        os.environ.setdefault("_SETTINGS_LOADED", "1")
+    return True
+
+
+@dataclass(frozen=True, slots=True)
 class Settings:
     """전역 설정"""
-    
+
     # 프로젝트 루트
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    
+    BASE_DIR: Path
+
     # 데이터 디렉토리
-    DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data"))
-    SESSIONS_DIR = DATA_DIR / "sessions"
-    MAPS_DIR = DATA_DIR / "maps"
-    
+    DATA_DIR: Path
+    SESSIONS_DIR: Path
+    MAPS_DIR: Path
+
     # SLAM 엔진 설정
-    SLAM_ENGINE_TYPE = os.getenv("SLAM_ENGINE", "rtabmap")
-    
+    SLAM_ENGINE_TYPE: str
+
     # RTAB-Map 설정
     # - 로컬: /path/to/rtabmap
     # - Docker: docker://container_name (예: docker://rtabmap)
-    RTABMAP_PATH = os.getenv("RTABMAP_PATH", "docker://rtabmap")
-    
+    RTABMAP_PATH: str
+
     # Fixed Map Mode
-    USE_FIXED_MAP = os.getenv("USE_FIXED_MAP", "false").lower() == "true"
-    FIXED_MAP_ID = os.getenv("FIXED_MAP_ID", "260202-202240")
-    
-    # API 설정
-    API_TITLE = "Indoor Navigation SLAM Backend"
-    API_VERSION = "1.0.0"
-    API_DESCRIPTION = "실내 네비게이션을 위한 Visual SLAM 백엔드"
-    
-    # CORS
-    CORS_ORIGINS = ["*"]
-    
+    USE_FIXED_MAP: bool
+    FIXED_MAP_ID: str
+
     # 로깅
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-    
+    LOG_LEVEL: str
+
     # 서버 포트 (중앙 관리)
-    SERVER_PORT = int(os.getenv("SERVER_PORT", "5000"))
-    
+    SERVER_PORT: int
+
+    # PostgreSQL (indoor-pathfinding-backend의 기존 DB 사용)
+    POSTGRES_HOST: str
+    POSTGRES_PORT: int
+    POSTGRES_DB: str
+    POSTGRES_USER: str
+    POSTGRES_PASSWORD: str
+    # 워커당 커넥션 풀 크기 (workers x max < Postgres max_connections)
+    POSTGRES_POOL_MIN: int
+    POSTGRES_POOL_MAX: int
+
+    # /api/slam/localize 요청 한도 (디코드 전에 거절)
+    MAX_LOCALIZE_IMAGES: int
+    MAX_LOCALIZE_BYTES: int  # 디코드된 이미지 합계 기준
+    # localize 전용 프로세스 수 (0 = 스레드 풀 사용; 프로세스마다 맵을 메모리에 따로 올림)
+    LOCALIZE_PROCESSES: int
+
+    # API 설정
+    API_TITLE: str = "Indoor Navigation SLAM Backend"
+    API_VERSION: str = "1.0.0"
+    API_DESCRIPTION: str = "실내 네비게이션을 위한 Visual SLAM 백엔드"
+
+    # CORS
+    CORS_ORIGINS: List[str] = field(default_factory=lambda: ["*"])
+
     @classmethod
-    def validate(cls):
+    def from_env(cls) -> "Settings":
+        """환경 변수를 한 번만 읽어 설정 생성"""
+        _load_env()
+
+        base_dir = Path(__file__).resolve().parent.parent
+        data_dir = Path(os.getenv("DATA_DIR", base_dir / "data"))
+
+        return cls(
+            BASE_DIR=base_dir,
+            DATA_DIR=data_dir,
+            SESSIONS_DIR=data_dir / "sessions",
+            MAPS_DIR=data_dir / "maps",
+            SLAM_ENGINE_TYPE=os.getenv("SLAM_ENGINE", "rtabmap"),
+            RTABMAP_PATH=os.getenv("RTABMAP_PATH", "docker://rtabmap"),
+            USE_FIXED_MAP=os.getenv("USE_FIXED_MAP", "false").lower() == "true",
+            FIXED_MAP_ID=os.getenv("FIXED_MAP_ID", "260202-202240"),
+            LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+            SERVER_PORT=int(os.getenv("SERVER_PORT", "5000")),
+            POSTGRES_HOST=os.getenv("POSTGRES_HOST", "indoor-pathfinding-db"),
+            POSTGRES_PORT=int(os.getenv("POSTGRES_PORT", "5432")),
+            POSTGRES_DB=os.getenv("POSTGRES_DB", "indoor_pathfinding"),
+            POSTGRES_USER=os.getenv("POSTGRES_USER", "indoor"),
+            POSTGRES_PASSWORD=os.getenv("POSTGRES_PASSWORD", "indoor1234"),
+            POSTGRES_POOL_MIN=int(os.getenv("POSTGRES_POOL_MIN", "4")),
+            POSTGRES_POOL_MAX=int(os.getenv("POSTGRES_POOL_MAX", "25")),
+            MAX_LOCALIZE_IMAGES=int(os.getenv("MAX_LOCALIZE_IMAGES", "10")),
+            MAX_LOCALIZE_BYTES=int(os.getenv("MAX_LOCALIZE_BYTES", str(32 * 1024 * 1024))),
+            LOCALIZE_PROCESSES=int(os.getenv("LOCALIZE_PROCESSES", "0")),
+        )
+
+    def validate(self):
         """설정 검증"""
-        if cls.SLAM_ENGINE_TYPE != "rtabmap":
-            raise ValueError(f"Invalid SLAM_ENGINE '{cls.SLAM_ENGINE_TYPE}', must be 'rtabmap'")
-        
-        if cls.SLAM_ENGINE_TYPE == "rtabmap":
+        if self.SLAM_ENGINE_TYPE != "rtabmap":
+            raise ValueError(f"Invalid SLAM_ENGINE '{self.SLAM_ENGINE_TYPE}', must be 'rtabmap'")
+
+        if self.SLAM_ENGINE_TYPE == "rtabmap":
             # Docker 모드인지 확인
-            if cls.RTABMAP_PATH.startswith("docker://"):
-                container_name = cls.RTABMAP_PATH.replace("docker://", "")
+            if self.RTABMAP_PATH.startswith("docker://"):
+                container_name = self.RTABMAP_PATH.replace("docker://", "")
                 print(f"[Settings] RTAB-Map Docker 모드: 컨테이너 '{container_name}'")
             else:
                 # 로컬 모드: 경로 존재 여부 확인 (선택사항)
-                if not Path(cls.RTABMAP_PATH).exists():
-                    print(f"Warning: RTAB-Map 경로를 찾을 수 없습니다: {cls.RTABMAP_PATH}")
+                if not Path(self.RTABMAP_PATH).exists():
+                    print(f"Warning: RTAB-Map 경로를 찾을 수 없습니다: {self.RTABMAP_PATH}")
 
-settings = Settings()
+settings = Settings.from_env()
 settings.validate()
@@ -1,10 +1,13 @@
 # main.py
-import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
 
 import asyncpg
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from config.settings import settings
 from slam_interface.factory import SLAMEngineFactory
@@ -13,26 +16,52 @@ import slam_engines  # 엔진 자동 등록
 from routes import scan, localize, path, viewer, maps, slam_routes, navigation_ws
 from storage.postgres_adapter import PostgresAdapter
 from utils.job_queue import SLAMJobQueue
+from utils import logger
 from utils.temp_file_manager import cleanup_orphaned_temps
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    """DB 풀 / SLAM 잡 큐 초기화 및 정리
+
+    Pool sizing: POSTGRES_POOL_MAX is per worker process, so
+    (uvicorn workers x POSTGRES_POOL_MAX) must stay below the server's
+    max_connections. Response time is best when the pool roughly matches
+    the number of concurrent DB clients; oversizing beyond that only adds
+    contention on the Postgres side.
+    """
 
     pool = await asyncpg.create_pool(
-        host=os.getenv("POSTGRES_HOST", "indoor-pathfinding-db"),
-        port=int(os.getenv("POSTGRES_PORT", "5432")),
-        database=os.getenv("POSTGRES_DB", "indoor_pathfinding"),
-        user=os.getenv("POSTGRES_USER", "indoor"),
-        password=os.getenv("POSTGRES_PASSWORD", "indoor1234"),
-        min_size=1,
-        max_size=10
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        database=settings.POSTGRES_DB,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        min_size=settings.POSTGRES_POOL_MIN,
+        max_size=settings.POSTGRES_POOL_MAX,
+        statement_cache_size=1024,
+        max_inactive_connection_lifetime=300,
+        command_timeout=30,
     )
     
+    app.state.pg_pool = pool
     postgres_adapter = PostgresAdapter(pool)
     slam_routes.postgres_adapter = postgres_adapter
 
-    slam_engine = SLAMEngineFactory.create(settings.SLAM_ENGINE_TYPE)
+    # 엔진은 요청 간 상태가 없으므로 프로세스당 하나를 공유 (라우트는 app.state 에서 참조)
+    slam_engine = SLAMEngineFactory.get(settings.SLAM_ENGINE_TYPE)
+    app.state.slam_engine = slam_engine
+
+    # CPU 바운드 localize(특징점 매칭/PnP)를 GIL 밖에서 병렬 실행 (LOCALIZE_PROCESSES > 0 일 때만)
+    app.state.slam_exec = None
+    if settings.LOCALIZE_PROCESSES > 0 and hasattr(slam_engine, "localize_executor"):
+        app.state.slam_exec = ProcessPoolExecutor(
+            max_workers=settings.LOCALIZE_PROCESSES,
+            # 스레드가 이미 떠 있는 프로세스에서 fork 하지 않도록 spawn
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        slam_engine.localize_executor = app.state.slam_exec
+
     job_queue = SLAMJobQueue(postgres_adapter, slam_engine, settings.MAPS_DIR)
     slam_routes.job_queue = job_queue
     
@@ -44,6 +73,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     await job_queue.shutdown()
     await pool.close()
+    if app.state.slam_exec is not None:
+        slam_engine.localize_executor = None
+        app.state.slam_exec.shutdown(wait=False, cancel_futures=True)
 
 
 # FastAPI 앱
@@ -51,7 +83,8 @@ app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS
@@ -63,6 +96,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 1KB 이상 JSON 응답(맵 목록/키프레임 등) gzip 압축
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+@app.exception_handler(asyncpg.PostgresError)
+async def postgres_error_handler(request: Request, exc: asyncpg.PostgresError):
+    """라우트에서 처리하지 않은 Postgres 오류는 여기서 한 번만 스택과 함께 기록"""
+    logger.exception("[Postgres] %s %s failed", request.method, request.url.path)
+    return ORJSONResponse(status_code=503, content={"detail": "Database unavailable"})
+
+
 print(f"\n{'='*60}")
 print(f"  {settings.API_TITLE}")
 print(f"  SLAM Engine: {settings.SLAM_ENGINE_TYPE}")
@@ -91,5 +135,13 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=settings.SERVER_PORT, log_level=settings.LOG_LEVEL.lower())
+    # uvloop / httptools 는 uvicorn[standard] 에 포함
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=settings.SERVER_PORT,
+        log_level=settings.LOG_LEVEL.lower(),
+        loop="uvloop",
+        http="httptools",
+    )
 
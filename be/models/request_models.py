@@ -23,9 +23,24 @@ class ChunkData(BaseModel):
     chunk_index: int
     frames: List[FrameData]
 
+class ChunkDataSoA(BaseModel):
+    """컬럼형(SoA) 청크 - 프레임별 모델 객체 없이 필드별 배열로 전달
+
+    frame i = (timestamps[i], positions[i], orientations[i], images[i], imu[i])
+    """
+    session_id: str
+    chunk_index: int
+    timestamps: List[int]
+    positions: List[List[float]]  # [[x, y, z], ...]
+    orientations: List[List[float]]  # [[qx, qy, qz, qw], ...]
+    images: List[str]  # base64
+    imu: Optional[List[Optional[dict]]] = None
+    camera_intrinsics: Optional[dict] = None  # 청크 내 모든 프레임 공통
+
 class SessionFinish(BaseModel):
     """스캔 완료"""
     session_id: str
+    total_frames: Optional[int] = None  # 클라이언트가 업로드한 총 프레임 수 (알면 폴링 없이 대기)
 
 class LocalizationRequest(BaseModel):
     """위치 추정 요청"""
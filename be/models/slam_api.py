@@ -1,16 +1,16 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, List, Optional
+
+
+# Request-body constraints are declared via Annotated metadata so they are
+# enforced inside pydantic-core instead of Python validator callbacks.
+NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
 
 
 class SLAMProcessRequest(BaseModel):
-    building_id: str = Field(..., json_schema_extra={"example": "550e8400-e29b-41d4-a716-446655440000"})
+    model_config = ConfigDict(extra='ignore', frozen=True)
 
-    @field_validator('building_id')
-    @classmethod
-    def validate_building_id(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError('building_id cannot be empty')
-        return v.strip()
+    building_id: NonEmptyStr = Field(..., json_schema_extra={"example": "550e8400-e29b-41d4-a716-446655440000"})
 
 
 class SLAMProcessResponse(BaseModel):
@@ -20,16 +20,11 @@ class SLAMProcessResponse(BaseModel):
 
 
 class SLAMLocalizeRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     map_id: str = Field(..., json_schema_extra={"example": "550e8400-e29b-41d4-a716-446655440000"})
-    images: List[str] = Field(..., json_schema_extra={"example": ["base64_img1"]})
+    images: Annotated[List[str], Field(min_length=1)] = Field(..., json_schema_extra={"example": ["base64_img1"]})
     camera_intrinsics: dict = Field(..., json_schema_extra={"example": {"fx": 500.0, "fy": 500.0, "cx": 320.0, "cy": 240.0}})
-    
-    @field_validator('images')
-    @classmethod
-    def validate_images(cls, v: list) -> list:
-        if len(v) < 1:
-            raise ValueError('Must provide at least 1 image')
-        return v
 
 
 class SLAMLocalizeResponse(BaseModel):
@@ -57,16 +52,9 @@ class HealthResponse(BaseModel):
 
 
 class MaskDebugRequest(BaseModel):
-    images: List[str] = Field(..., json_schema_extra={"example": ["base64_img1"]})
-
-    @field_validator('images')
-    @classmethod
-    def validate_images(cls, v: list) -> list:
-        if len(v) < 1:
-            raise ValueError('Must provide at least 1 image')
-        if len(v) > 5:
-            raise ValueError('Maximum 5 images allowed')
-        return v
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    images: Annotated[List[str], Field(min_length=1, max_length=5)] = Field(..., json_schema_extra={"example": ["base64_img1"]})
 
 
 class MaskDebugImage(BaseModel):
@@ -1,14 +1,44 @@
 # routes/localize.py
 from fastapi import APIRouter, HTTPException, File, Form, UploadFile
 from typing import List
-from PIL import Image, ImageOps
-import io
+import asyncio
+import functools
 
 from slam_interface.factory import SLAMEngineFactory
 from config.settings import settings
+from utils.image_size import image_size
 
 router = APIRouter(prefix="/api", tags=["localize"])
 
+@functools.lru_cache(maxsize=64)
+def _extract_intrinsics_cached(db_path: str, mtime_ns: int) -> dict:
+    """맵 DB 캘리브레이션 (mtime_ns 는 캐시 키로만 사용 - 맵 재생성 시 다시 읽음)"""
+    return SLAMEngineFactory.get(settings.SLAM_ENGINE_TYPE).extract_intrinsics_from_db(db_path)
+
+@functools.lru_cache(maxsize=64)
+def _scale_intrinsics_cached(intrinsics_items: tuple, width: int, height: int) -> dict:
+    """scale_intrinsics 는 (intrinsics, 해상도) 의 순수 함수이므로 결과 재사용"""
+    engine = SLAMEngineFactory.get(settings.SLAM_ENGINE_TYPE)
+    return engine.scale_intrinsics(dict(intrinsics_items), width, height)
+
+def _query_image_size(buf: bytes) -> tuple:
+    """EXIF 보정 후 (width, height)
+    
+    JPEG/PNG는 헤더만 읽고, 그 외 포맷(HEIC/WebP 등)만 Pillow로 연다.
+    """
+    try:
+        size = image_size(buf)
+    except Exception:
+        size = None
+    if size is not None:
+        return size
+    
+    from PIL import Image, ImageOps
+    import io
+    
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(buf)))
+    return image.size
+
 @router.post("/localize")
 async def localize(
     map_id: str = Form(...),
@@ -34,15 +64,13 @@ async def localize(
         )
     
     try:
-        image_bytes = []
-        for img in images:
-            content = await img.read()
+        image_bytes = list(await asyncio.gather(*(img.read() for img in images)))
+        for img, content in zip(images, image_bytes):
             if len(content) == 0:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Empty image file: {img.filename}"
                 )
-            image_bytes.append(content)
     except HTTPException:
         raise
     except Exception as e:
@@ -51,12 +79,12 @@ async def localize(
             detail=f"Failed to read images: {str(e)}"
         )
     
-    slam_engine = SLAMEngineFactory.create(settings.SLAM_ENGINE_TYPE)
+    slam_engine = SLAMEngineFactory.get(settings.SLAM_ENGINE_TYPE)
     
     # Extract intrinsics from DB
     db_path = settings.MAPS_DIR / f"{map_id}.db"
     try:
-        intrinsics = slam_engine.extract_intrinsics_from_db(str(db_path))
+        intrinsics = dict(_extract_intrinsics_cached(str(db_path), db_path.stat().st_mtime_ns))
         print(f"[Localize] Extracted intrinsics: {intrinsics}")
     except Exception as e:
         raise HTTPException(
@@ -66,9 +94,7 @@ async def localize(
     
     # Get first image resolution (after EXIF orientation correction)
     try:
-        first_image = Image.open(io.BytesIO(image_bytes[0]))
-        first_image = ImageOps.exif_transpose(first_image)
-        img_width, img_height = first_image.size
+        img_width, img_height = _query_image_size(image_bytes[0])
         print(f"[Localize] Query image resolution (EXIF corrected): {img_width}x{img_height}")
     except Exception as e:
         raise HTTPException(
@@ -80,7 +106,9 @@ async def localize(
     if (img_width, img_height) != (intrinsics['width'], intrinsics['height']):
         print(f"[Localize] Resolution mismatch: DB={intrinsics['width']}x{intrinsics['height']}, Query={img_width}x{img_height}")
         try:
-            intrinsics = slam_engine.scale_intrinsics(intrinsics, img_width, img_height)
+            intrinsics = dict(_scale_intrinsics_cached(
+                tuple(sorted(intrinsics.items())), img_width, img_height
+            ))
             print(f"[Localize] Scaled intrinsics: {intrinsics}")
         except Exception as e:
             raise HTTPException(
@@ -1,39 +1,79 @@
 # routes/maps.py
+import asyncio
+import functools
+import hashlib
 import logging
-from fastapi import APIRouter, HTTPException
+import os
+import re
+from fastapi import APIRouter, HTTPException, Request, Response
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from config.settings import settings
-from slam_engines.rtabmap.database_parser import DatabaseParser
+from slam_engines.rtabmap.database_parser import DatabaseParser, PARSE_EXECUTOR
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["maps"])
 
+_db_parser = DatabaseParser()
+
+# map_YYYYMMDD_HHMMSS (map_ 접두사 생략 및 뒤 접미사 허용)
+_MAP_TIMESTAMP_RE = re.compile(r'(?:map_)?(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})(?:_|$)')
+
+# 동시에 열어두는 SQLite 파일 수 상한
+_PARSE_CONCURRENCY = 8
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(path: str, mtime_ns: int, size: int) -> Dict:
+    """맵 목록용 요약 메타데이터 (mtime_ns / size 는 캐시 키로만 사용, 개수만 조회)"""
+    metadata = _db_parser.read_counts_sync(path)
+    return {
+        'num_keyframes': metadata.get('num_keyframes', 0),
+        'num_map_points': metadata.get('num_map_points', 0),
+        'loop_closures': metadata.get('loop_closures', 0),
+    }
+
+
+def _maps_etag(db_stats: List[tuple]) -> str:
+    """(이름, mtime_ns, size) 목록 기반 ETag - 맵 파일이 바뀌지 않으면 동일"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name, st in db_stats:
+        digest.update(f"{name}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
 @router.get("/maps")
-async def get_maps():
+async def get_maps(request: Request, response: Response):
     """List available RTABMap databases for relocalization"""
     # 고정 맵 모드
     if settings.USE_FIXED_MAP:
         fixed_map_path = settings.MAPS_DIR / f"{settings.FIXED_MAP_ID}.db"
         
         if not fixed_map_path.exists():
-            logger.warning(f"Fixed map not found: {fixed_map_path}")
+            logger.warning("Fixed map not found: %s", fixed_map_path)
             return {"maps": []}
         
         # DB 파싱
-        db_parser = DatabaseParser()
-        metadata = await db_parser.parse_database(str(fixed_map_path))
+        metadata = await _db_parser.parse_database(str(fixed_map_path))
         
         # 좌표 로그 출력 (첫 5개 키프레임)
         if metadata.get('keyframes'):
-            logger.info(f"Fixed Map: {settings.FIXED_MAP_ID}")
-            logger.info(f"Total Keyframes: {len(metadata['keyframes'])}")
+            logger.info("Fixed Map: %s", settings.FIXED_MAP_ID)
+            logger.info("Total Keyframes: %s", len(metadata['keyframes']))
             for i, kf in enumerate(metadata['keyframes'][:5]):
                 pos = kf.get('position', [0, 0, 0])
-                logger.info(f"  Keyframe {kf['id']}: x={pos[0]:.3f}, y={pos[1]:.3f}, z={pos[2]:.3f}")
+                logger.info("  Keyframe %s: x=%.3f, y=%.3f, z=%.3f", kf['id'], pos[0], pos[1], pos[2])
         
         return {
             "maps": [{
@@ -50,34 +90,27 @@ async def get_maps():
     if not maps_dir.exists():
         return {"maps": []}
     
-    maps = []
-    db_parser = DatabaseParser()
-    
     try:
-        # Scan for .db files
-        for db_file in sorted(maps_dir.glob("*.db")):
-            try:
-                map_id = db_file.stem
-                
-                # Parse created_at from filename (map_YYYYMMDD_HHMMSS pattern)
-                created_at = _parse_map_timestamp(map_id)
-                
-                # Get keyframe count from database
-                db_metadata = await db_parser.parse_database(str(db_file))
-                keyframe_count = db_metadata.get('num_keyframes', 0)
-                
-                # Use map_id as name (can be enhanced later with metadata file)
-                maps.append({
-                    "id": map_id,
-                    "name": map_id,
-                    "created_at": created_at,
-                    "keyframe_count": keyframe_count
-                })
-            except Exception as e:
-                # Skip individual map if parsing fails
-                print(f"[Maps] Failed to parse map {db_file.name}: {e}")
-                continue
+        with os.scandir(maps_dir) as entries:
+            db_stats = sorted(
+                (entry.name, entry.stat()) for entry in entries
+                if entry.name.endswith(".db") and entry.is_file()
+            )
+        
+        # 맵 파일이 그대로면 304 (본문/파싱 없이 stat 만으로 응답)
+        etag = _maps_etag(db_stats)
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        
+        # 맵별 파싱은 서로 독립적이므로 스레드 풀로 동시에 처리
+        semaphore = asyncio.Semaphore(_PARSE_CONCURRENCY)
+        results = await asyncio.gather(*(
+            _parse_one(maps_dir / name, st, semaphore) for name, st in db_stats
+        ))
         
+        maps = [m for m in results if m is not None]
+        maps.sort(key=lambda m: m["id"])
         return {"maps": maps}
         
     except PermissionError:
@@ -92,6 +125,33 @@ async def get_maps():
         )
 
 
+async def _parse_one(db_file: Path, st: os.stat_result, semaphore: asyncio.Semaphore) -> Optional[Dict]:
+    """단일 맵 DB 요약 (실패 시 None)"""
+    try:
+        map_id = db_file.stem
+        
+        # Parse created_at from filename (map_YYYYMMDD_HHMMSS pattern)
+        created_at = _parse_map_timestamp(map_id)
+        
+        # Get keyframe count from database (cached until the file changes)
+        async with semaphore:
+            db_metadata = await asyncio.get_running_loop().run_in_executor(
+                PARSE_EXECUTOR, _parse_cached, str(db_file), st.st_mtime_ns, st.st_size
+            )
+        
+        # Use map_id as name (can be enhanced later with metadata file)
+        return {
+            "id": map_id,
+            "name": map_id,
+            "created_at": created_at,
+            "keyframe_count": db_metadata.get('num_keyframes', 0)
+        }
+    except Exception as e:
+        # Skip individual map if parsing fails
+        print(f"[Maps] Failed to parse map {db_file.name}: {e}")
+        return None
+
+
 def _parse_map_timestamp(map_id: str) -> str:
     """
     Parse timestamp from map_id (format: map_YYYYMMDD_HHMMSS).
@@ -103,22 +163,15 @@ def _parse_map_timestamp(map_id: str) -> str:
         ISO 8601 timestamp string (e.g., "2025-02-07T14:30:22Z")
         Falls back to current time if parsing fails
     """
-    try:
-        # Remove 'map_' prefix
-        timestamp_part = map_id.replace("map_", "")
-        
-        # Split by underscore to get date and time
-        parts = timestamp_part.split("_")
-        
-        if len(parts) >= 2:
-            date_str = parts[0]  # YYYYMMDD
-            time_str = parts[1]  # HHMMSS
-            
-            # Parse to datetime
-            dt = datetime.strptime(f"{date_str}{time_str}", "%Y%m%d%H%M%S")
-            return dt.isoformat() + "Z"
-    except Exception:
-        pass
+    match = _MAP_TIMESTAMP_RE.match(map_id)
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+        try:
+            # 범위 검증만 (strptime 대비 로케일/락 비용 없음)
+            datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+            return f"{year}-{month}-{day}T{hour}:{minute}:{second}Z"
+        except ValueError:
+            pass
     
     # Fallback: use current time
     return datetime.now().isoformat() + "Z"
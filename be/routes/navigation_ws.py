@@ -21,7 +21,7 @@ async def websocket_navigation(websocket: WebSocket):
                 required = ["user_id", "map_id", "start", "goal"]
                 for key in required:
                     if key not in message:
-                        await websocket.send_json(ErrorResponse(message=f"Missing field {key}").dict())
+                        await websocket.send_json(ErrorResponse(message=f"Missing field {key}").model_dump())
                         break
                 else:
                     start = message["start"]
@@ -40,7 +40,7 @@ async def websocket_navigation(websocket: WebSocket):
                     session_id = message.get("session_id")
                     position = message.get("position")
                     if not session_id or not position:
-                        await websocket.send_json(ErrorResponse(message="session_id and position required").dict())
+                        await websocket.send_json(ErrorResponse(message="session_id and position required").model_dump())
                         continue
 
                     result = navigation_service.update_position(session_id, position)
@@ -58,9 +58,9 @@ async def websocket_navigation(websocket: WebSocket):
                         await websocket.send_json({"type": "session_completed", "session_id": session_id})
 
                 except KeyError as e:
-                    await websocket.send_json(ErrorResponse(message=str(e)).dict())
+                    await websocket.send_json(ErrorResponse(message=str(e)).model_dump())
                 except Exception as e:
-                    await websocket.send_json(ErrorResponse(message=f"Internal error: {e}").dict())
+                    await websocket.send_json(ErrorResponse(message=f"Internal error: {e}").model_dump())
 
             elif message_type == "session_end":
                 session_id = message.get("session_id")
@@ -68,13 +68,13 @@ async def websocket_navigation(websocket: WebSocket):
                     navigation_service.close_session(session_id)
                     await websocket.send_json({"type": "session_ended", "session_id": session_id})
                 else:
-                    await websocket.send_json(ErrorResponse(message="session_id required").dict())
+                    await websocket.send_json(ErrorResponse(message="session_id required").model_dump())
 
             else:
-                await websocket.send_json(ErrorResponse(message=f"Unknown message type: {message_type}").dict())
+                await websocket.send_json(ErrorResponse(message=f"Unknown message type: {message_type}").model_dump())
 
     except WebSocketDisconnect:
         return
     except Exception as e:
-        await websocket.send_json(ErrorResponse(message=f"Connection error: {e}").dict())
+        await websocket.send_json(ErrorResponse(message=f"Connection error: {e}").model_dump())
         await websocket.close()
@@ -1,33 +1,28 @@
 # routes/path.py
 from fastapi import APIRouter
+import numpy as np
 
 from models.request_models import PathRequest
 from models.response_models import PathResponse
 
 router = APIRouter(prefix="/api/path", tags=["path"])
 
+# 경로 보간 계수 (10개 웨이포인트, 요청마다 재생성하지 않음)
+_PATH_T = np.linspace(0.0, 1.0, 10).reshape(-1, 1)
+
 @router.post("/calculate", response_model=PathResponse)
 async def calculate_path(request: PathRequest):
     """경로 계산 (A*)"""
     
     # 더미 경로
-    start = request.start_position
-    end = [start[0] + 5.0, start[1], start[2] + 5.0]
+    start = np.asarray(request.start_position[:3], dtype=np.float64)
+    end = start + (5.0, 0.0, 5.0)
     
-    path = []
-    for i in range(10):
-        t = i / 9.0
-        point = [
-            start[0] + (end[0] - start[0]) * t,
-            start[1] + (end[1] - start[1]) * t,
-            start[2] + (end[2] - start[2]) * t,
-        ]
-        path.append(point)
+    path = (start + (end - start) * _PATH_T).tolist()
     
     return PathResponse(
         map_id=request.map_id,
         path=path,
-        distance=7.07,
+        distance=float(np.linalg.norm(end - start)),
         instruction="5m 직진 후 우회전",
     )
-
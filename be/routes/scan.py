@@ -1,25 +1,115 @@
 # routes/scan.py
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 import uuid
 import asyncio
-import json
-from typing import List
+import struct
+import orjson
+import numpy as np
+from typing import AsyncIterator, List
 
-from models.request_models import DeviceInfo, ChunkData, SessionFinish
+from models.request_models import DeviceInfo, ChunkData, ChunkDataSoA, SessionFinish
 from models.response_models import (
     SessionStartResponse,
     ChunkUploadResponse,
     SessionFinishResponse,
     SessionStatusResponse
 )
-from storage.storage_manager import StorageManager
-from services.slam_service import process_slam_async
+# 상태 변경 알림이 SSE 구독자에게 전달되도록 slam_service 와 같은 StorageManager 사용
+from services.slam_service import process_slam_async, storage
 from utils import logger, log_error
 
 router = APIRouter(prefix="/api/scan", tags=["scan"])
 
-storage = StorageManager()
+_STREAM_U32 = struct.Struct("<I")
+_MAX_STREAM_FRAMES = 1000  # frame_idx = chunk_index * 1000 + i
+_MAX_STREAM_METADATA_BYTES = 16 * 1024 * 1024
+# 프레임당 필드 상한 (길이 접두 u32 를 그대로 믿고 최대 4 GiB 를 버퍼링하지 않도록)
+_MAX_STREAM_IMAGE_BYTES = 32 * 1024 * 1024
+_MAX_STREAM_DEPTH_BYTES = 16 * 1024 * 1024  # uint16 4096x2048
+
+def _pad(values: list, default, length: int) -> list:
+    """values 를 length 길이로 맞춤 (부족분은 default, 초과분은 버림)"""
+    return (values + [default] * (length - len(values)))[:length]
+
+def _pad_array(rows: list, default: tuple, length: int) -> np.ndarray:
+    """rows 를 (length, len(default)) float64 배열로 변환 (부족한 행은 default)"""
+    arr = np.empty((length, len(default)), dtype=np.float64)
+    arr[:] = default
+    count = min(len(rows), length)
+    if count:
+        arr[:count] = np.asarray(rows[:count], dtype=np.float64)
+    return arr
+
+def _parse_chunk_metadata(metadata, frame_count: int, log_tag: str) -> dict:
+    """청크 메타데이터 JSON -> 프레임 수에 맞춰 패딩된 컬럼 (save_chunk_binary 인자)
+    
+    배열은 한 번만 패딩/절단하여 프레임 루프에서 범위 검사를 없앤다.
+    """
+    try:
+        metadata_dict = orjson.loads(metadata)
+    except orjson.JSONDecodeError as e:
+        logger.warning("[%s] 메타데이터 파싱 실패: %s", log_tag, e)
+        raise HTTPException(status_code=400, detail="Invalid metadata JSON")
+    
+    try:
+        # 포즈는 청크 단위 연속 배열(SoA)로 받아 형태를 한 번에 검증
+        positions = _pad_array(metadata_dict.get("positions", []), (0.0, 0.0, 0.0), frame_count)
+        orientations = _pad_array(metadata_dict.get("orientations", []), (0.0, 0.0, 0.0, 1.0), frame_count)
+    except (TypeError, ValueError) as e:
+        logger.warning("[%s] 포즈 배열 형식 오류: %s", log_tag, e)
+        raise HTTPException(status_code=400, detail="positions must be [x, y, z] and orientations [qx, qy, qz, qw] per frame")
+    
+    return {
+        "timestamps": _pad(metadata_dict.get("timestamps", []), 0, frame_count),
+        "positions": positions,
+        "orientations": orientations,
+        "imu": _pad(metadata_dict.get("imu_data", []), None, frame_count),
+        "camera_intrinsics": metadata_dict.get("camera_intrinsics"),
+        "depth_widths": _pad(metadata_dict.get("depth_widths", []), None, frame_count),
+        "depth_heights": _pad(metadata_dict.get("depth_heights", []), None, frame_count),
+    }
+
+class _LengthPrefixedStream:
+    """request.stream() 위에서 u32 길이 접두 필드를 순서대로 읽는 리더"""
+    
+    def __init__(self, stream: AsyncIterator[bytes]):
+        self._stream = stream.__aiter__()
+        self._buf = bytearray()
+    
+    async def _next_chunk(self) -> bytes:
+        try:
+            return await self._stream.__anext__()
+        except StopAsyncIteration:
+            raise ValueError("Unexpected end of stream")
+    
+    async def read_exactly(self, n: int) -> bytes:
+        while len(self._buf) < n:
+            self._buf += await self._next_chunk()
+        data = bytes(self._buf[:n])
+        del self._buf[:n]
+        return data
+    
+    async def read_u32(self) -> int:
+        return _STREAM_U32.unpack(await self.read_exactly(_STREAM_U32.size))[0]
+    
+    async def iter_exactly(self, n: int) -> AsyncIterator[bytes]:
+        """n 바이트를 도착한 조각 단위로 그대로 넘김 (필드 전체를 버퍼링하지 않음)"""
+        remaining = n
+        if self._buf:
+            piece = bytes(self._buf[:remaining])
+            del self._buf[:len(piece)]
+            remaining -= len(piece)
+            yield piece
+        while remaining > 0:
+            chunk = await self._next_chunk()
+            if len(chunk) > remaining:
+                self._buf += chunk[remaining:]
+                chunk = chunk[:remaining]
+            remaining -= len(chunk)
+            if chunk:
+                yield chunk
 
 @router.post("/start", response_model=SessionStartResponse)
 async def start_scan(device_info: DeviceInfo):
@@ -27,16 +117,16 @@ async def start_scan(device_info: DeviceInfo):
     
     session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
     
-    logger.info(f"[START] 세션 시작 요청: {session_id}")
-    logger.debug(f"  Device: {device_info.model} / {device_info.os} {device_info.os_version}")
+    logger.info("[START] 세션 시작 요청: %s", session_id)
+    logger.debug("  Device: %s / %s %s", device_info.model, device_info.os, device_info.os_version)
     
     try:
         metadata = await storage.create_session(
             session_id=session_id,
-            device_info=device_info.dict()
+            device_info=device_info.model_dump()
         )
         
-        logger.info(f"[START] 세션 생성 완료: {session_id}")
+        logger.info("[START] 세션 생성 완료: %s", session_id)
         
         return SessionStartResponse(
             session_id=session_id,
@@ -53,22 +143,27 @@ async def start_scan(device_info: DeviceInfo):
 async def upload_chunk(chunk: ChunkData):
     """청크 단위 프레임 업로드"""
     
-    logger.info(f"[CHUNK] 업로드: session={chunk.session_id}, chunk={chunk.chunk_index}, frames={len(chunk.frames)}")
+    logger.info("[CHUNK] 업로드: session=%s, chunk=%s, frames=%s", chunk.session_id, chunk.chunk_index, len(chunk.frames))
     
     try:
         if not await storage.session_exists(chunk.session_id):
-            logger.warning(f"[CHUNK] 세션 없음: {chunk.session_id}")
+            logger.warning("[CHUNK] 세션 없음: %s", chunk.session_id)
             raise HTTPException(status_code=404, detail="Session not found")
         
-        frames_dict = [frame.dict() for frame in chunk.frames]
-        
-        saved_count = await storage.save_chunk(
+        # 프레임 모델을 dict 로 덤프하지 않고 속성에서 바로 컬럼 구성
+        frames = chunk.frames
+        saved_count = await storage.save_chunk_columns(
             session_id=chunk.session_id,
             chunk_index=chunk.chunk_index,
-            frames=frames_dict
+            images=[frame.image for frame in frames],
+            timestamps=[frame.timestamp for frame in frames],
+            positions=[frame.position for frame in frames],
+            orientations=[frame.orientation for frame in frames],
+            imu=[frame.imu for frame in frames],
+            camera_intrinsics=[frame.camera_intrinsics for frame in frames],
         )
         
-        logger.info(f"[CHUNK] 저장 완료: {saved_count}개 프레임")
+        logger.info("[CHUNK] 저장 완료: %s개 프레임", saved_count)
         
         return ChunkUploadResponse(
             status="ok",
@@ -84,6 +179,51 @@ async def upload_chunk(chunk: ChunkData):
         log_error(e, f"CHUNK {chunk.session_id}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chunk-columnar", response_model=ChunkUploadResponse)
+async def upload_chunk_columnar(chunk: ChunkDataSoA):
+    """컬럼형(SoA) 청크 업로드 - 프레임별 모델 생성 없이 배열 단위로 저장"""
+    
+    num_frames = len(chunk.images)
+    logger.info("[CHUNK-SOA] 업로드: session=%s, chunk=%s, frames=%s", chunk.session_id, chunk.chunk_index, num_frames)
+    
+    try:
+        if not await storage.session_exists(chunk.session_id):
+            logger.warning("[CHUNK-SOA] 세션 없음: %s", chunk.session_id)
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        column_lengths = {len(chunk.timestamps), len(chunk.positions), len(chunk.orientations), num_frames}
+        if chunk.imu is not None:
+            column_lengths.add(len(chunk.imu))
+        if len(column_lengths) != 1:
+            raise HTTPException(status_code=400, detail="All frame columns must have the same length")
+        
+        saved_count = await storage.save_chunk_columns(
+            session_id=chunk.session_id,
+            chunk_index=chunk.chunk_index,
+            images=chunk.images,
+            timestamps=chunk.timestamps,
+            positions=chunk.positions,
+            orientations=chunk.orientations,
+            imu=chunk.imu,
+            camera_intrinsics=[chunk.camera_intrinsics] * num_frames,
+        )
+        
+        logger.info("[CHUNK-SOA] 저장 완료: %s개 프레임", saved_count)
+        
+        return ChunkUploadResponse(
+            status="ok",
+            session_id=chunk.session_id,
+            chunk_index=chunk.chunk_index,
+            received_frames=saved_count,
+            message=f"Chunk {chunk.chunk_index} saved successfully"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, f"CHUNK-SOA {chunk.session_id}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/chunk-binary", response_model=ChunkUploadResponse)
 async def upload_chunk_binary(
     session_id: str = Form(...),
@@ -95,67 +235,29 @@ async def upload_chunk_binary(
 ):
     """바이너리 multipart 업로드 - JPEG 프레임 + 뎁스 맵 직접 업로드"""
     
-    logger.info(f"[CHUNK-BINARY] 업로드: session={session_id}, chunk={chunk_index}, frames={len(images)}, depths={len(depths)}")
+    logger.info("[CHUNK-BINARY] 업로드: session=%s, chunk=%s, frames=%s, depths=%s", session_id, chunk_index, len(images), len(depths))
     
     try:
         if not await storage.session_exists(session_id):
-            logger.warning(f"[CHUNK-BINARY] 세션 없음: {session_id}")
+            logger.warning("[CHUNK-BINARY] 세션 없음: %s", session_id)
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Parse metadata JSON
-        try:
-            metadata_dict = json.loads(metadata)
-        except json.JSONDecodeError as e:
-            logger.warning(f"[CHUNK-BINARY] 메타데이터 파싱 실패: {e}")
-            raise HTTPException(status_code=400, detail="Invalid metadata JSON")
-        
-        timestamps = metadata_dict.get("timestamps", [])
-        positions = metadata_dict.get("positions", [])
-        orientations = metadata_dict.get("orientations", [])
-        imu_data_list = metadata_dict.get("imu_data", [])
-        camera_intrinsics = metadata_dict.get("camera_intrinsics")
-        depth_widths = metadata_dict.get("depth_widths", [])
-        depth_heights = metadata_dict.get("depth_heights", [])
-        
-        # Read depth data into memory
-        depth_data_map = {}
-        for idx, depth_file in enumerate(depths):
-            depth_bytes = await depth_file.read()
-            depth_data_map[idx] = depth_bytes
-        
-        # Save each image with corresponding depth
-        saved_count = 0
-        for idx, image_file in enumerate(images):
-            try:
-                image_data = await image_file.read()  # Already binary JPEG
-                
-                # Prepare frame data
-                frame_data = {
-                    "image_data": image_data,
-                    "timestamp": timestamps[idx] if idx < len(timestamps) else 0,
-                    "position": positions[idx] if idx < len(positions) else [0, 0, 0],
-                    "orientation": orientations[idx] if idx < len(orientations) else [0, 0, 0, 1],
-                    "imu_data": imu_data_list[idx] if idx < len(imu_data_list) else None,
-                    "camera_intrinsics": camera_intrinsics,
-                    "depth_data": depth_data_map.get(idx),
-                    "depth_width": depth_widths[idx] if idx < len(depth_widths) and depth_widths[idx] is not None else None,
-                    "depth_height": depth_heights[idx] if idx < len(depth_heights) and depth_heights[idx] is not None else None,
-                }
-                
-                # Save frame using storage manager
-                await storage.save_frame_binary(
-                    session_id=session_id,
-                    chunk_index=chunk_index,
-                    frame_index=idx,
-                    frame_data=frame_data
-                )
-                saved_count += 1
-                
-            except Exception as e:
-                logger.error(f"[CHUNK-BINARY] 프레임 저장 실패 {idx}: {e}")
-                raise
+        columns = _parse_chunk_metadata(metadata, len(images), "CHUNK-BINARY")
         
-        logger.info(f"[CHUNK-BINARY] 저장 완료: {saved_count}개 프레임")
+        # Depth maps are parsed into arrays, so read them concurrently;
+        # JPEG images are streamed from the upload spool file to disk as-is
+        depth_contents = _pad(list(await asyncio.gather(*(f.read() for f in depths))), None, len(images))
+        
+        # 청크 전체를 한 번에 저장 (파일 쓰기 동시 수행, 청크 JSON/메타데이터는 1회 갱신)
+        saved_count = await storage.save_chunk_binary(
+            session_id=session_id,
+            chunk_index=chunk_index,
+            image_files=[image_file.file for image_file in images],
+            depths=depth_contents,
+            **columns,
+        )
+        
+        logger.info("[CHUNK-BINARY] 저장 완료: %s개 프레임", saved_count)
         
         return ChunkUploadResponse(
             status="ok",
@@ -171,49 +273,149 @@ async def upload_chunk_binary(
         log_error(e, f"CHUNK-BINARY {session_id}/{chunk_index}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chunk-stream", response_model=ChunkUploadResponse)
+async def upload_chunk_stream(request: Request, session_id: str, chunk_index: int):
+    """길이 접두 바이너리 스트림 업로드 - multipart 파트/스풀 파일 없이 단일 본문
+    
+    Body (u32 는 little-endian):
+        [u32 n_frames][u32 meta_len][metadata JSON (chunk-binary 와 동일)]
+        [u32 img_len][JPEG] x n_frames
+        [u32 depth_len][uint16 depth] x n_frames  (depth_len 0 = 뎁스 없음)
+    
+    JPEG 는 도착하는 대로 디스크에 기록된다.
+    """
+    
+    logger.info("[CHUNK-STREAM] 업로드: session=%s, chunk=%s", session_id, chunk_index)
+    
+    written_images = []
+    try:
+        if not await storage.session_exists(session_id):
+            logger.warning("[CHUNK-STREAM] 세션 없음: %s", session_id)
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        reader = _LengthPrefixedStream(request.stream())
+        try:
+            num_frames = await reader.read_u32()
+            meta_len = await reader.read_u32()
+            if num_frames > _MAX_STREAM_FRAMES or meta_len > _MAX_STREAM_METADATA_BYTES:
+                raise ValueError(f"Stream header out of range: frames={num_frames}, meta_len={meta_len}")
+            
+            columns = _parse_chunk_metadata(await reader.read_exactly(meta_len), num_frames, "CHUNK-STREAM")
+            
+            for idx in range(num_frames):
+                img_len = await reader.read_u32()
+                if img_len > _MAX_STREAM_IMAGE_BYTES:
+                    raise ValueError(f"Frame {idx} image too large: {img_len} bytes")
+                written_images.append(await storage.write_frame_image(
+                    session_id, chunk_index, idx, reader.iter_exactly(img_len)
+                ))
+            
+            depth_contents = []
+            for idx, width, height in zip(range(num_frames), columns["depth_widths"], columns["depth_heights"]):
+                depth_len = await reader.read_u32()
+                # 메타데이터에 크기가 있으면 uint16 width x height 를 넘을 수 없음
+                limit = _MAX_STREAM_DEPTH_BYTES
+                if isinstance(width, int) and isinstance(height, int) and width > 0 and height > 0:
+                    limit = min(limit, width * height * 2)
+                if depth_len > limit:
+                    raise ValueError(f"Frame {idx} depth too large: {depth_len} bytes (limit {limit})")
+                depth_contents.append(await reader.read_exactly(depth_len) if depth_len else None)
+        except ValueError as e:
+            logger.warning("[CHUNK-STREAM] 스트림 형식 오류: %s", e)
+            raise HTTPException(status_code=400, detail=f"Malformed chunk stream: {e}")
+        
+        saved_count = await storage.save_chunk_binary(
+            session_id=session_id,
+            chunk_index=chunk_index,
+            image_files=None,
+            depths=depth_contents,
+            **columns,
+        )
+        written_images = []
+        
+        logger.info("[CHUNK-STREAM] 저장 완료: %s개 프레임", saved_count)
+        
+        return ChunkUploadResponse(
+            status="ok",
+            session_id=session_id,
+            chunk_index=chunk_index,
+            received_frames=saved_count,
+            message=f"Chunk {chunk_index} saved successfully"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error(e, f"CHUNK-STREAM {session_id}/{chunk_index}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # 실패 시 청크 JSON 에 기록되지 않은 이미지가 남지 않도록 정리
+        for image_path in written_images:
+            image_path.unlink(missing_ok=True)
+
 @router.post("/finish", response_model=SessionFinishResponse)
 async def finish_scan(data: SessionFinish):
     """스캔 완료 - SLAM 처리 시작"""
     
-    logger.info(f"[FINISH] 완료 요청: {data.session_id}")
+    logger.info("[FINISH] 완료 요청: %s", data.session_id)
     
     try:
         if not await storage.session_exists(data.session_id):
-            logger.warning(f"[FINISH] 세션 없음: {data.session_id}")
+            logger.warning("[FINISH] 세션 없음: %s", data.session_id)
             raise HTTPException(status_code=404, detail="Session not found")
         
-        logger.info(f"[FINISH] 마지막 청크 완료 대기 중...")
-        prev_frame_count = 0
-        stable_count = 0
+        logger.info("[FINISH] 마지막 청크 완료 대기 중...")
         max_wait_seconds = 10
         
-        for _ in range(max_wait_seconds * 2):
-            await asyncio.sleep(0.5)
-            
-            status = await storage.get_session_status(data.session_id)
-            current_frame_count = status.get("total_frames", 0)
-            
-            if current_frame_count == prev_frame_count and current_frame_count > 0:
-                stable_count += 1
-                if stable_count >= 3:
-                    logger.info(f"[FINISH] 프레임 수 안정화됨: {current_frame_count}개")
-                    break
-            else:
-                stable_count = 0
+        if data.total_frames:
+            # 기대 프레임 수를 알면 저장 완료 알림만 기다림
+            try:
+                frame_count = await storage.wait_for_frames(
+                    data.session_id, data.total_frames, timeout=max_wait_seconds
+                )
+                logger.info("[FINISH] 전체 프레임 수신 완료: %s개", frame_count)
+            except TimeoutError:
+                logger.warning("[FINISH] 프레임 대기 시간 초과: 기대 %s개", data.total_frames)
+        else:
+            # 기대 프레임 수를 모르면 프레임 수 안정화까지 폴링
+            prev_frame_count = 0
+            stable_count = 0
             
-            prev_frame_count = current_frame_count
+            for _ in range(max_wait_seconds * 2):
+                await asyncio.sleep(0.5)
+                
+                status = await storage.get_session_status(data.session_id)
+                current_frame_count = status.get("total_frames", 0)
+                
+                if current_frame_count == prev_frame_count and current_frame_count > 0:
+                    stable_count += 1
+                    if stable_count >= 3:
+                        logger.info("[FINISH] 프레임 수 안정화됨: %s개", current_frame_count)
+                        break
+                else:
+                    stable_count = 0
+                
+                prev_frame_count = current_frame_count
+        
+        failed_writes = await storage.wait_for_writes(data.session_id)
+        if failed_writes:
+            # 뎁스 파일이 없는 프레임은 DB 빌드에서 빠지므로 조용히 진행하지 않고 실패 처리
+            logger.error("[FINISH] 백그라운드 파일 쓰기 실패: %s건", failed_writes)
+            error = f"Failed to write {failed_writes} depth frame(s)"
+            await storage.update_status(data.session_id, "failed", error=error)
+            raise HTTPException(status_code=500, detail=error)
         
         final_status = await storage.get_session_status(data.session_id)
         total_frames = final_status.get("total_frames", 0)
-        logger.info(f"[FINISH] 최종 프레임 수: {total_frames}개")
+        logger.info("[FINISH] 최종 프레임 수: %s개", total_frames)
         
         await storage.update_status(data.session_id, "queued")
         
         from slam_interface.factory import SLAMEngineFactory
         from config.settings import settings
-        slam_engine = SLAMEngineFactory.create(settings.SLAM_ENGINE_TYPE)
+        slam_engine = SLAMEngineFactory.get(settings.SLAM_ENGINE_TYPE)
         
-        logger.info(f"[FINISH] SLAM 처리 시작: engine={settings.SLAM_ENGINE_TYPE}")
+        logger.info("[FINISH] SLAM 처리 시작: engine=%s", settings.SLAM_ENGINE_TYPE)
         
         asyncio.create_task(process_slam_async(data.session_id, slam_engine))
         
@@ -250,8 +452,26 @@ async def get_scan_status(session_id: str):
         )
         
     except ValueError as e:
-        logger.warning(f"[STATUS] 세션 없음: {session_id}")
+        logger.warning("[STATUS] 세션 없음: %s", session_id)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         log_error(e, f"STATUS {session_id}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/status/{session_id}/stream")
+async def stream_scan_status(session_id: str):
+    """스캔/처리 상태 스트림 (SSE) - 상태가 바뀔 때만 이벤트 전송, completed/failed 후 종료"""
+    
+    if not await storage.session_exists(session_id):
+        logger.warning("[STATUS-STREAM] 세션 없음: %s", session_id)
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    async def event_stream():
+        async for status in storage.watch_status(session_id):
+            yield b"data: " + orjson.dumps(status) + b"\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
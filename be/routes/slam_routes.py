@@ -1,10 +1,15 @@
 import base64
 import io
 import functools
+import os
+import time
 import asyncio
 import cv2
 import numpy as np
-from fastapi import APIRouter, HTTPException, status
+from typing import List
+
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile, status
+from fastapi.responses import ORJSONResponse
 from PIL import Image, ImageOps
 
 from models.slam_api import (
@@ -20,17 +25,142 @@ from models.slam_api import (
     MatchDebugResponse,
 )
 from slam_interface.factory import SLAMEngineFactory
-from config.settings import Settings
+from config.settings import settings
 from utils import logger
 from slam_engines.rtabmap.database_parser import DatabaseParser
+from utils.base64_codec import b64decode
+from utils.image_size import jpeg_header
 
-settings = Settings()
+router = APIRouter(prefix="/api/slam", tags=["SLAM"], default_response_class=ORJSONResponse)
 
-router = APIRouter(prefix="/api/slam", tags=["SLAM"])
+# DatabaseParser 는 상태가 없으므로 (호출마다 커넥션을 열고 닫음) 공유해도 안전
+_db_parser = DatabaseParser()
 
 postgres_adapter = None
 job_queue = None
 
+# 헬스 프로브(LB/k8s)가 몰려도 DB 왕복은 TTL 당 한 번만
+_HEALTH_TTL_SECONDS = 2.0
+_health_cache = (0.0, None)  # (monotonic 시각, postgres 상태)
+
+# status / metadata 폴링이 같은 세션 목록을 연달아 조회하므로 짧게 공유
+_SESSIONS_TTL_SECONDS = 1.0
+_sessions_cache = {}  # building_id -> (monotonic 시각, sessions)
+
+_KEYFRAME_COUNT_CACHE_SIZE = 64
+_keyframe_count_cache = {}  # (db 경로, mtime_ns, size) -> num_keyframes
+
+
+async def _get_sessions_cached(building_id: str) -> list:
+    """get_sessions_by_building_id 결과를 TTL 동안 재사용
+
+    반환 목록은 캐시와 공유되므로 읽기 전용으로 다룰 것 (타임스탬프도
+    datetime 그대로 두고 orjson 이 직렬화).
+    """
+    now = time.monotonic()
+    cached = _sessions_cache.get(building_id)
+    if cached is None or now - cached[0] >= _SESSIONS_TTL_SECONDS:
+        sessions = await postgres_adapter.get_sessions_by_building_id(building_id)
+        # 만료 항목 정리 (건물 수만큼 무한히 쌓이지 않도록)
+        for key in [k for k, (ts, _) in _sessions_cache.items() if now - ts >= _SESSIONS_TTL_SECONDS]:
+            del _sessions_cache[key]
+        _sessions_cache[building_id] = (now, sessions)
+    else:
+        sessions = cached[1]
+    return sessions
+
+
+def _resolve_upload_path(file_path: str) -> str:
+    """Spring Boot 가 저장한 상대 경로(./storage/uploads/UUID.db) -> 웹 컨테이너 마운트 경로"""
+    # In the web container, uploads are mounted at /app/storage/uploads/
+    if file_path.startswith(("./storage/uploads/", "storage/uploads/")):
+        return f"/app/storage/uploads/{file_path.rsplit('/', 1)[-1]}"
+    return file_path
+
+
+@functools.lru_cache(maxsize=1024)
+def _map_db_path(map_id: str) -> tuple:
+    """map_id -> (Path, str) 단일 맵 DB 경로 (요청마다 Path 연산 / str 변환 생략)"""
+    path = settings.MAPS_DIR / f"{map_id}.db"
+    return path, str(path)
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_intrinsics(engine, db_path: str, mtime_ns: int) -> dict:
+    """맵 DB 의 카메라 intrinsics (엔진 + 경로 + mtime 기준 캐시, 맵 재생성 시 자동 무효화)"""
+    return engine.extract_intrinsics_from_db(db_path)
+
+
+def _floor_intrinsics(engine, floors: list) -> dict:
+    """첫 번째로 읽히는 층 DB 의 intrinsics 사본 (없으면 None)"""
+    for fm in floors:
+        try:
+            mtime_ns = os.stat(fm["file_path"]).st_mtime_ns
+            # 캐시된 dict 가 변경되지 않도록 얕은 복사본 반환
+            return dict(_cached_intrinsics(engine, fm["file_path"], mtime_ns))
+        except Exception:
+            continue
+    return None
+
+
+def _to_db_resolution(img_bytes: bytes, db_w: int, db_h: int) -> bytes:
+    """쿼리 이미지를 DB 해상도의 정방향 JPEG 로 맞춤
+
+    이미 DB 해상도이고 EXIF 회전이 없는 JPEG 는 헤더만 확인하고 그대로 사용
+    (Pillow 디코드/리사이즈/재인코딩 생략).
+    """
+    try:
+        header = jpeg_header(img_bytes)
+    except Exception:
+        header = None
+    if header == (db_w, db_h, 1):
+        return img_bytes
+
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(img_bytes)))
+    if img.size != (db_w, db_h):
+        img = img.resize((db_w, db_h), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG', quality=95)
+    return buf.getvalue()
+
+
+def _check_localize_limits(num_images: int, total_bytes: int):
+    """쿼리 이미지 개수 / 전체 크기 한도 초과 시 디코드 전에 거절"""
+    if num_images > settings.MAX_LOCALIZE_IMAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many images: {num_images} (max {settings.MAX_LOCALIZE_IMAGES})",
+        )
+    if total_bytes > settings.MAX_LOCALIZE_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Payload too large: {total_bytes} bytes of images (max {settings.MAX_LOCALIZE_BYTES})",
+        )
+
+
+def _overall_status(sessions: list) -> str:
+    """세션 상태들을 한 번만 훑어 건물 전체 상태 결정 (FAILED > PROCESSING > UPLOADED)"""
+    all_completed = True
+    has_processing = False
+    for s in sessions:
+        st = s.get("status")
+        if st == "COMPLETED":
+            continue
+        all_completed = False
+        if st == "FAILED":
+            return "FAILED"
+        if st == "PROCESSING":
+            has_processing = True
+    if all_completed:
+        return "COMPLETED"
+    return "PROCESSING" if has_processing else "UPLOADED"
+
+
+def _app_engine(http_request: Request):
+    """lifespan 에서 app.state 에 올려둔 공유 SLAM 엔진 (없으면 팩토리 싱글턴)"""
+    engine = getattr(http_request.app.state, "slam_engine", None)
+    return engine or SLAMEngineFactory.get(settings.SLAM_ENGINE_TYPE)
+
 
 @router.post(
     "/process",
@@ -45,18 +175,15 @@ async def process_slam(request: SLAMProcessRequest):
     if not sessions:
         raise HTTPException(status_code=404, detail=f"No sessions found for building {request.building_id}")
     
-    session_db_pairs = []
-    for session in sessions:
-        file_path = session.get("file_path")
-        if not file_path:
-            logger.warning(f"[SLAM-PROCESS] Session {session['id']} has no file_path, skipping")
-            continue
-        # Spring Boot stores relative paths like ./storage/uploads/UUID.db
-        # In the web container, uploads are mounted at /app/storage/uploads/
-        if file_path.startswith("./storage/uploads/") or file_path.startswith("storage/uploads/"):
-            filename = file_path.split("/")[-1]
-            file_path = f"/app/storage/uploads/{filename}"
-        session_db_pairs.append((session["id"], file_path))
+    # enqueue 는 건물 단위 1회 (큐에 (building_id, 전체 세션 목록) 한 건만 넣음)
+    session_db_pairs = [
+        (session["id"], _resolve_upload_path(file_path))
+        for session in sessions
+        if (file_path := session.get("file_path"))
+    ]
+    if len(session_db_pairs) < len(sessions):
+        skipped = [s["id"] for s in sessions if not s.get("file_path")]
+        logger.warning(f"[SLAM-PROCESS] Sessions without file_path, skipping: {skipped}")
     
     if not session_db_pairs:
         raise HTTPException(status_code=404, detail=f"No uploadedfiles found for building {request.building_id}")
@@ -65,15 +192,17 @@ async def process_slam(request: SLAMProcessRequest):
     
     try:
         await job_queue.enqueue(request.building_id, session_db_pairs)
-        
-        return SLAMProcessResponse(
-            map_id=request.building_id,
-            status="PROCESSING",
-            queue_position=job_queue.get_queue_length()
-        )
-    except Exception as e:
-        logger.error(f"[SLAM-PROCESS] Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except RuntimeError as e:
+        # 종료 중인 큐 (enqueue 가 던지는 유일한 예외)
+        logger.warning(f"[SLAM-PROCESS] Enqueue rejected: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    _sessions_cache.pop(request.building_id, None)
+    
+    return SLAMProcessResponse(
+        map_id=request.building_id,
+        status="PROCESSING",
+        queue_position=job_queue.get_queue_length()
+    )
 
 
 @router.get("/status/{building_id}")
@@ -81,38 +210,32 @@ async def get_slam_status(building_id: str):
     if postgres_adapter is None:
         raise HTTPException(status_code=500, detail="Service not initialized")
     
-    sessions = await postgres_adapter.get_sessions_by_building_id(building_id)
+    sessions = await _get_sessions_cached(building_id)
     if not sessions:
         raise HTTPException(status_code=404, detail=f"No sessions found for building {building_id}")
     
-    for s in sessions:
-        if s.get("created_at"):
-            s["created_at"] = s["created_at"].isoformat()
-        if s.get("updated_at"):
-            s["updated_at"] = s["updated_at"].isoformat()
+    overall_status = _overall_status(sessions)
     
-    statuses = [s.get("status") for s in sessions]
-    if all(st == "COMPLETED" for st in statuses):
-        overall_status = "COMPLETED"
-    elif any(st == "FAILED" for st in statuses):
-        overall_status = "FAILED"
-    elif any(st == "PROCESSING" for st in statuses):
-        overall_status = "PROCESSING"
-    else:
-        overall_status = "UPLOADED"
-    
-    return {
+    # orjson 이 datetime 을 ISO 8601 로 직접 직렬화 (jsonable_encoder 단계 생략)
+    return ORJSONResponse({
         "building_id": building_id,
         "overall_status": overall_status,
         "sessions": sessions,
-    }
+    })
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
+    global _health_cache
     postgres_status = "not_initialized"
     if postgres_adapter is not None:
-        postgres_status = await postgres_adapter.health_check()
+        checked_at, cached_status = _health_cache
+        now = time.monotonic()
+        if cached_status is not None and now - checked_at < _HEALTH_TTL_SECONDS:
+            postgres_status = cached_status
+        else:
+            postgres_status = await postgres_adapter.health_check()
+            _health_cache = (now, postgres_status)
     
     queue_length = job_queue.get_queue_length() if job_queue else 0
     overall_status = "healthy" if postgres_status == "connected" else "degraded"
@@ -124,40 +247,57 @@ async def health_check():
     )
 
 
+async def _map_keyframe_count(building_id: str) -> int:
+    """맵 DB 의 키프레임 수 (DB 가 없거나 파싱 실패 시 0)
+
+    (경로, mtime_ns, size) 로 캐시하므로 맵이 바뀌지 않는 한 메타데이터
+    폴링은 SQLite 를 다시 열지 않음.
+    """
+    db_path, db_path_str = _map_db_path(building_id)
+    try:
+        st = await asyncio.to_thread(db_path.stat)
+    except OSError:
+        return 0
+    key = (db_path_str, st.st_mtime_ns, st.st_size)
+    cached = _keyframe_count_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        parsed = await _db_parser.parse_database(db_path_str)
+    except Exception as e:
+        logger.warning(f"[SLAM-METADATA] Failed to parse database: {e}")
+        return 0
+    if 'error' in parsed:
+        # 파싱 실패 결과는 캐시하지 않음 (다음 요청에서 재시도)
+        return parsed.get('num_keyframes', 0)
+    num_keyframes = parsed.get('num_keyframes', 0)
+    _keyframe_count_cache[key] = num_keyframes
+    while len(_keyframe_count_cache) > _KEYFRAME_COUNT_CACHE_SIZE:
+        # dict 는 삽입 순서 유지 -> 가장 오래된 항목부터 제거
+        del _keyframe_count_cache[next(iter(_keyframe_count_cache))]
+    return num_keyframes
+
+
 @router.get("/maps/{building_id}/metadata", response_model=MapMetadata)
 async def get_map_metadata(building_id: str):
     if postgres_adapter is None:
         raise HTTPException(status_code=500, detail="Service not initialized")
     
-    sessions = await postgres_adapter.get_sessions_by_building_id(building_id)
+    # 세션 조회(Postgres)와 맵 DB 파싱(SQLite)은 서로 독립 -> 동시에 진행
+    sessions, num_keyframes = await asyncio.gather(
+        _get_sessions_cached(building_id),
+        _map_keyframe_count(building_id),
+    )
     if not sessions:
         raise HTTPException(status_code=404, detail=f"No sessions found for building {building_id}")
     
-    num_keyframes = 0
-    db_path = settings.MAPS_DIR / f"{building_id}.db"
-    if db_path.exists():
-        try:
-            parser = DatabaseParser()
-            parsed = await parser.parse_database(str(db_path))
-            num_keyframes = parsed.get('num_keyframes', 0)
-        except Exception as e:
-            logger.warning(f"[SLAM-METADATA] Failed to parse database: {e}")
-    
     earliest_created = min(
         (s["created_at"] for s in sessions if s.get("created_at")),
         default=None,
     )
     created_at = earliest_created.isoformat() if earliest_created else ""
     
-    statuses = [s.get("status") for s in sessions]
-    if all(st == "COMPLETED" for st in statuses):
-        overall_status = "COMPLETED"
-    elif any(st == "FAILED" for st in statuses):
-        overall_status = "FAILED"
-    elif any(st == "PROCESSING" for st in statuses):
-        overall_status = "PROCESSING"
-    else:
-        overall_status = "UPLOADED"
+    overall_status = _overall_status(sessions)
     
     return MapMetadata(
         map_id=building_id,
@@ -168,23 +308,33 @@ async def get_map_metadata(building_id: str):
     )
 
 
-async def _localize_impl(request: SLAMLocalizeRequest, mask_persons: bool = False, engine=None) -> SLAMLocalizeResponse:
+async def _localize_impl(request: SLAMLocalizeRequest, engine, mask_persons: bool = False) -> SLAMLocalizeResponse:
     """Core localization logic shared by v1 and v2 endpoints."""
-    import asyncio
+    # 디코드 전에 개수 / 크기 검사 (base64 4글자 = 3바이트)
+    _check_localize_limits(
+        len(request.images),
+        sum(len(img_b64) for img_b64 in request.images) * 3 // 4,
+    )
+    # --- decode images (스레드에서 병렬 디코드, 이벤트 루프 비차단) ---
+    decoded = await asyncio.gather(
+        *[asyncio.to_thread(b64decode, img_b64) for img_b64 in request.images],
+        return_exceptions=True,
+    )
+    for i, result in enumerate(decoded):
+        if isinstance(result, Exception):
+            raise HTTPException(status_code=400, detail=f"Invalid base64 in image {i+1}: {result}")
 
-    building_id = request.map_id
-    logger.info(f"[SLAM-LOCALIZE] building_id: {building_id}, mask_persons: {mask_persons}")
+    return await _localize_images(request.map_id, list(decoded), engine, mask_persons)
 
-    # --- decode images ---
-    try:
-        image_bytes_list = []
-        for i, img_b64 in enumerate(request.images):
-            try:
-                image_bytes_list.append(base64.b64decode(img_b64))
-            except Exception as e:
-                raise ValueError(f"Invalid base64 in image {i+1}: {e}")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+async def _localize_images(
+    building_id: str,
+    image_bytes_list: list,
+    engine,
+    mask_persons: bool = False,
+) -> SLAMLocalizeResponse:
+    """Localize already-decoded query images against every floor of a building."""
+    logger.info(f"[SLAM-LOCALIZE] building_id: {building_id}, mask_persons: {mask_persons}")
 
     # --- discover floor maps ---
     floor_maps = []
@@ -192,31 +342,20 @@ async def _localize_impl(request: SLAMLocalizeRequest, mask_persons: bool = Fals
         floor_maps = await postgres_adapter.get_floor_maps(building_id)
 
     if not floor_maps:
-        single_db = settings.MAPS_DIR / f"{building_id}.db"
-        if single_db.exists():
-            floor_maps = [{"floor_id": "", "floor_name": "", "level": 0, "file_path": str(single_db)}]
+        single_db, single_db_str = _map_db_path(building_id)
+        if await asyncio.to_thread(single_db.exists):
+            floor_maps = [{"floor_id": "", "floor_name": "", "level": 0, "file_path": single_db_str}]
         else:
             raise HTTPException(status_code=404, detail=f"No maps found for building {building_id}")
 
     # --- resolve DB paths ---
-    slam_engine = engine or SLAMEngineFactory.create(settings.SLAM_ENGINE_TYPE)
+    slam_engine = engine
 
-    resolved_floors = []
-    for fm in floor_maps:
-        fp = fm["file_path"]
-        if fp.startswith("./storage/uploads/") or fp.startswith("storage/uploads/"):
-            filename = fp.split("/")[-1]
-            fp = f"/app/storage/uploads/{filename}"
-        resolved_floors.append({**fm, "file_path": fp})
+    resolved_floors = [{**fm, "file_path": _resolve_upload_path(fm["file_path"])} for fm in floor_maps]
 
     # --- extract intrinsics from first available DB ---
-    intrinsics = None
-    for fm in resolved_floors:
-        try:
-            intrinsics = slam_engine.extract_intrinsics_from_db(fm["file_path"])
-            break
-        except Exception:
-            continue
+    # stat / (캐시 미스 시) SQLite 읽기는 블로킹 -> 스레드에서
+    intrinsics = await asyncio.to_thread(_floor_intrinsics, slam_engine, resolved_floors)
 
     if intrinsics is None:
         raise HTTPException(status_code=500, detail="Failed to extract intrinsics from any floor DB")
@@ -226,12 +365,7 @@ async def _localize_impl(request: SLAMLocalizeRequest, mask_persons: bool = Fals
     resized = []
     for img_bytes in image_bytes_list:
         try:
-            img = ImageOps.exif_transpose(Image.open(io.BytesIO(img_bytes)))
-            if img.size != (db_w, db_h):
-                img = img.resize((db_w, db_h), Image.LANCZOS)
-            buf = io.BytesIO()
-            img.save(buf, format='JPEG', quality=95)
-            resized.append(buf.getvalue())
+            resized.append(_to_db_resolution(img_bytes, db_w, db_h))
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Invalid image data: {e}")
     image_bytes_list = resized
@@ -280,15 +414,37 @@ async def _localize_impl(request: SLAMLocalizeRequest, mask_persons: bool = Fals
 
 
 @router.post("/localize", response_model=SLAMLocalizeResponse, status_code=status.HTTP_200_OK)
-async def localize_in_map(request: SLAMLocalizeRequest):
+async def localize_in_map(request: SLAMLocalizeRequest, http_request: Request):
     """Localize against all floors of a building in parallel."""
-    return await _localize_impl(request, mask_persons=False)
+    return await _localize_impl(request, _app_engine(http_request), mask_persons=False)
+
+
+@router.post("/localize/multipart", response_model=SLAMLocalizeResponse, status_code=status.HTTP_200_OK)
+async def localize_in_map_multipart(
+    http_request: Request,
+    map_id: str = Form(...),
+    files: List[UploadFile] = File(...),
+):
+    """Same as /localize, but with raw image files (multipart/form-data) instead of base64 JSON.
+
+    Skips the ~33% base64 size overhead and the server-side decode pass.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="At least one image is required")
+    # UploadFile.size 는 파서가 이미 스풀링한 크기 (알 수 없으면 0 으로 보고 읽은 뒤 재검사)
+    _check_localize_limits(len(files), sum(f.size or 0 for f in files))
+    image_bytes_list = await asyncio.gather(*[f.read() for f in files])
+    for i, img_bytes in enumerate(image_bytes_list):
+        if not img_bytes:
+            raise HTTPException(status_code=400, detail=f"Empty image {i+1}")
+    _check_localize_limits(len(files), sum(len(b) for b in image_bytes_list))
+    return await _localize_images(map_id, list(image_bytes_list), _app_engine(http_request), mask_persons=False)
 
 
 @router.post("/v2/localize", response_model=SLAMLocalizeResponse, status_code=status.HTTP_200_OK)
-async def localize_in_map_v2(request: SLAMLocalizeRequest):
+async def localize_in_map_v2(request: SLAMLocalizeRequest, http_request: Request):
     """Localize with YOLO-based person masking for improved accuracy in crowded spaces."""
-    return await _localize_impl(request, mask_persons=True)
+    return await _localize_impl(request, _app_engine(http_request), mask_persons=True)
 
 
 # --- SuperPoint + LightGlue engine singleton ---
@@ -311,7 +467,7 @@ def _get_sp_engine():
 @router.post("/v3/localize", response_model=SLAMLocalizeResponse, status_code=status.HTTP_200_OK)
 async def localize_in_map_v3(request: SLAMLocalizeRequest):
     """Localize using SuperPoint + LightGlue for higher accuracy in challenging environments."""
-    return await _localize_impl(request, mask_persons=False, engine=_get_sp_engine())
+    return await _localize_impl(request, _get_sp_engine(), mask_persons=False)
 
 
 @router.post("/v2/debug/mask", response_model=MaskDebugResponse, status_code=status.HTTP_200_OK)
@@ -333,7 +489,7 @@ async def debug_person_mask(request: MaskDebugRequest):
 
     for i, img_b64 in enumerate(request.images):
         try:
-            img_bytes = base64.b64decode(img_b64)
+            img_bytes = b64decode(img_b64)
         except Exception:
             raise HTTPException(status_code=400, detail=f"Invalid base64 in image {i + 1}")
 
@@ -370,7 +526,7 @@ async def _debug_matches_impl(
     building_id = request.map_id
 
     try:
-        img_bytes = base64.b64decode(request.images[0])
+        img_bytes = b64decode(request.images[0])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid base64: {e}")
 
@@ -378,37 +534,25 @@ async def _debug_matches_impl(
     if postgres_adapter is not None:
         floor_maps = await postgres_adapter.get_floor_maps(building_id)
     if not floor_maps:
-        single_db = settings.MAPS_DIR / f"{building_id}.db"
-        if single_db.exists():
-            floor_maps = [{"floor_id": "", "floor_name": "", "level": 0, "file_path": str(single_db)}]
+        single_db, single_db_str = _map_db_path(building_id)
+        if await asyncio.to_thread(single_db.exists):
+            floor_maps = [{"floor_id": "", "floor_name": "", "level": 0, "file_path": single_db_str}]
         else:
             raise HTTPException(status_code=404, detail=f"No maps found for building {building_id}")
 
-    slam_engine = SLAMEngineFactory.create(settings.SLAM_ENGINE_TYPE)
-    resolved_floors = []
-    for fm in floor_maps:
-        fp = fm["file_path"]
-        if fp.startswith("./storage/uploads/") or fp.startswith("storage/uploads/"):
-            fp = f"/app/storage/uploads/{fp.split('/')[-1]}"
-        resolved_floors.append({**fm, "file_path": fp})
+    slam_engine = SLAMEngineFactory.get(settings.SLAM_ENGINE_TYPE)
+    resolved_floors = [{**fm, "file_path": _resolve_upload_path(fm["file_path"])} for fm in floor_maps]
 
-    intrinsics = None
-    for fm in resolved_floors:
-        try:
-            intrinsics = slam_engine.extract_intrinsics_from_db(fm["file_path"])
-            break
-        except Exception:
-            continue
+    # stat / (캐시 미스 시) SQLite 읽기는 블로킹 -> 스레드에서
+    intrinsics = await asyncio.to_thread(_floor_intrinsics, slam_engine, resolved_floors)
     if intrinsics is None:
         raise HTTPException(status_code=500, detail="Failed to extract intrinsics")
 
     db_w, db_h = intrinsics["width"], intrinsics["height"]
-    pil_img = ImageOps.exif_transpose(Image.open(io.BytesIO(img_bytes)))
-    if pil_img.size != (db_w, db_h):
-        pil_img = pil_img.resize((db_w, db_h), Image.LANCZOS)
-    buf = io.BytesIO()
-    pil_img.save(buf, format="JPEG", quality=95)
-    img_bytes = buf.getvalue()
+    try:
+        img_bytes = _to_db_resolution(img_bytes, db_w, db_h)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image data: {e}")
 
     best_result = None
     best_floor = None
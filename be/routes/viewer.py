@@ -1,18 +1,93 @@
 # routes/viewer.py
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, FileResponse, Response
 from typing import Optional
 from pathlib import Path
-import json
+import asyncio
+import gzip
+import hashlib
+import logging
 import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import orjson
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from config.settings import settings
 from slam_engines.rtabmap.database_parser import DatabaseParser
+from storage.storage_manager import MAP_INDEX_NAME, VIEWER_STATS_KEY
+from utils.trajectory import trajectory_stats
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/viewer", tags=["viewer"])
 
+_db_parser = DatabaseParser()
+
+# 뷰어 HTML 템플릿은 import 시 한 번만 컴파일
+_TEMPLATE_ENV = Environment(
+    loader=FileSystemLoader(str(settings.BASE_DIR / "templates")),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+_VIEWER_TEMPLATE = _TEMPLATE_ENV.get_template("viewer.html")
+
+# 템플릿이 바뀌면 (배포) 페이지 ETag 도 바뀌도록
+_VIEWER_TEMPLATE_MTIME = os.stat(_VIEWER_TEMPLATE.filename).st_mtime_ns
+
+# 맵은 같은 경로에 다시 빌드될 수 있으므로 immutable 대신 짧은 max-age + ETag 재검증
+_CACHE_CONTROL = "public, max-age=300"
+
+# map_id -> ((db mtime_ns, size), 템플릿 컨텍스트, pose 없는 HTML 의 UTF-8 바이트)
+_VIEW_CACHE_SIZE = 32
+_view_cache = OrderedDict()
+
+# _resolve_cache 는 asyncio.to_thread 워커 여러 개에서 동시에 갱신되므로 조회/축출을 잠금으로 보호
+_cache_lock = threading.Lock()
+
+
+# map_id -> 경로 해석 결과 캐시. 맵 디렉토리에 파일이 추가/삭제되면 디렉토리 mtime 이
+# 바뀌므로 그때 무효화되고, sessions/ 쪽 PLY 는 TTL 로 갱신된다.
+_RESOLVE_TTL_SECONDS = 60.0
+_RESOLVE_CACHE_SIZE = 512
+_resolve_cache = OrderedDict()  # (kind, map_id) -> (maps_dir mtime_ns, 만료 시각, Optional[Path])
+
+
+def _cached_resolve(kind: str, map_id: str, resolver) -> Optional[Path]:
+    try:
+        dir_mtime = settings.MAPS_DIR.stat().st_mtime_ns
+    except OSError:
+        dir_mtime = None
+    now = time.monotonic()
+    key = (kind, map_id)
+    with _cache_lock:
+        cached = _resolve_cache.get(key)
+    if cached is not None and cached[0] == dir_mtime and now < cached[1]:
+        return cached[2]
+
+    # 파일시스템 탐색은 잠금 밖에서
+    result = resolver(map_id)
+    with _cache_lock:
+        _resolve_cache[key] = (dir_mtime, now + _RESOLVE_TTL_SECONDS, result)
+        _resolve_cache.move_to_end(key)
+        while len(_resolve_cache) > _RESOLVE_CACHE_SIZE:
+            _resolve_cache.popitem(last=False)
+    return result
+
 
 def _resolve_map_db_path(map_id: str) -> Optional[Path]:
+    return _cached_resolve("db", map_id, _find_map_db_path)
+
+
+def _resolve_ply_path(map_id: str) -> Optional[Path]:
+    return _cached_resolve("ply", map_id, _find_ply_path)
+
+
+def _find_map_db_path(map_id: str) -> Optional[Path]:
     maps_dir = settings.MAPS_DIR
 
     direct_candidates = [
@@ -40,7 +115,26 @@ def _resolve_map_db_path(map_id: str) -> Optional[Path]:
     return None
 
 
-def _resolve_ply_path(map_id: str) -> Optional[Path]:
+_ply_index = (None, {})  # (_index.json mtime_ns, map_id -> PLY 경로)
+
+
+def _load_ply_index() -> dict:
+    """maps_dir/_index.json 을 mtime 이 바뀔 때만 다시 읽음"""
+    global _ply_index
+    index_path = settings.MAPS_DIR / MAP_INDEX_NAME
+    try:
+        mtime = index_path.stat().st_mtime_ns
+        if _ply_index[0] != mtime:
+            _ply_index = (mtime, orjson.loads(index_path.read_bytes()))
+    except FileNotFoundError:
+        return {}
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning("[Viewer] PLY index read failed: %s", e)
+        return {}
+    return _ply_index[1]
+
+
+def _find_ply_path(map_id: str) -> Optional[Path]:
     maps_dir = settings.MAPS_DIR
     for candidate in [
         maps_dir / f"{map_id}.ply",
@@ -49,6 +143,14 @@ def _resolve_ply_path(map_id: str) -> Optional[Path]:
         if candidate.exists():
             return candidate
 
+    # save_map 이 기록한 인덱스
+    indexed = _load_ply_index().get(map_id)
+    if indexed:
+        ply = Path(indexed)
+        if ply.exists():
+            return ply
+
+    # 인덱스 도입 전에 만들어진 맵: 세션 디렉토리 탐색
     sessions_dir = settings.DATA_DIR / "sessions"
     if sessions_dir.exists():
         for session_dir in sessions_dir.iterdir():
@@ -61,35 +163,242 @@ def _resolve_ply_path(map_id: str) -> Optional[Path]:
     return None
 
 
+def _saved_view_stats(db_path: Path, st: os.stat_result) -> Optional[dict]:
+    """<map>_meta.json 의 뷰어 통계 (DB 가 저장 이후 바뀌었거나 없으면 None)"""
+    meta_path = db_path.with_name(f"{db_path.stem}_meta.json")
+    try:
+        stats = orjson.loads(meta_path.read_bytes()).get(VIEWER_STATS_KEY)
+    except (OSError, orjson.JSONDecodeError, AttributeError):
+        return None
+    if not stats or stats.get("db_mtime_ns") != st.st_mtime_ns or stats.get("db_size") != st.st_size:
+        return None
+    return stats
+
+
+def _etag(*parts, weak: bool = False) -> str:
+    digest = hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match 가 현재 ETag 와 일치하는지 (약한 비교)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in header.split(","))
+
+
+# PLY 스칼라 타입 -> little-endian NumPy dtype
+_PLY_DTYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "<i2", "int16": "<i2", "ushort": "<u2", "uint16": "<u2",
+    "int": "<i4", "int32": "<i4", "uint": "<u4", "uint32": "<u4",
+    "float": "<f4", "float32": "<f4", "double": "<f8", "float64": "<f8",
+}
+_VOXEL_SEARCH_STEPS = 10
+
+
+def _voxel_first_indices(xyz: np.ndarray, origin: np.ndarray, cell: float) -> np.ndarray:
+    """voxel 마다 처음 나온 점의 인덱스"""
+    idx = np.ascontiguousarray(np.floor((xyz - origin) / cell).astype(np.int64))
+    keys = idx.view(np.dtype((np.void, idx.dtype.itemsize * 3))).ravel()
+    _, first = np.unique(keys, return_index=True)
+    return first
+
+
+def _downsampled_ply(ply_path: Path, max_points: int) -> Optional[bytes]:
+    """vertex 만 있는 binary_little_endian PLY 를 voxel grid 로 max_points 이하로 줄인 PLY 바이트
+
+    원본이 이미 작거나 지원하지 않는 형식이면 None (원본 그대로 전송).
+    """
+    with open(ply_path, "rb") as f:
+        header = []
+        while len(header) < 256:
+            line = f.readline()
+            if not line:
+                return None
+            header.append(line)
+            if line.strip() == b"end_header":
+                break
+        else:
+            return None
+
+        fields, count, vertex_line = [], 0, None
+        for i, line in enumerate(header):
+            tok = line.split()
+            if tok[:2] == [b"format", b"ascii"] or tok[:2] == [b"format", b"binary_big_endian"]:
+                return None
+            if tok and tok[0] == b"element":
+                if tok[1] != b"vertex" or vertex_line is not None:
+                    return None  # face 등 다른 element 가 있으면 그대로 전송
+                count, vertex_line = int(tok[2]), i
+            elif tok and tok[0] == b"property" and vertex_line is not None:
+                dtype = _PLY_DTYPES.get(tok[1].decode())
+                if dtype is None:
+                    return None  # list 속성
+                fields.append((tok[2].decode(), dtype))
+
+        names = {name for name, _ in fields}
+        if count <= max_points or not {"x", "y", "z"} <= names:
+            return None
+        data = np.fromfile(f, dtype=np.dtype(fields), count=count)
+
+    xyz = np.column_stack([data["x"], data["y"], data["z"]]).astype(np.float64)
+    finite = np.isfinite(xyz).all(axis=1)
+    data, xyz = data[finite], xyz[finite]
+    if len(data) <= max_points:
+        keep = np.arange(len(data))
+    else:
+        origin = xyz.min(axis=0)
+        extent = np.maximum(xyz.max(axis=0) - origin, 1e-6)
+        # 공간을 꽉 채운다고 가정한 셀 크기에서 시작해, 점 수가 max_points 에 가까워질 때까지 이분 탐색
+        cell = float(np.cbrt(np.prod(extent) / max_points))
+        lo, hi, keep = 0.0, None, None
+        for _ in range(_VOXEL_SEARCH_STEPS):
+            first = _voxel_first_indices(xyz, origin, cell)
+            if len(first) <= max_points:
+                keep, hi = first, cell
+                if len(first) >= max_points * 0.8:
+                    break
+            else:
+                lo = cell
+            cell = (lo + hi) / 2 if hi is not None else cell * 2
+        if keep is None:
+            keep = np.linspace(0, len(data) - 1, max_points).astype(np.int64)
+        keep = np.sort(keep)
+
+    subset = data[keep]
+    header[vertex_line] = f"element vertex {len(subset)}\n".encode()
+    return b"".join(header) + subset.tobytes()
+
+
+def _gzipped_ply(ply_path: Path) -> Path:
+    """PLY 의 gzip 사본 경로 (없거나 원본보다 오래됐으면 새로 압축)"""
+    gz_path = ply_path.with_name(ply_path.name + ".gz")
+    src_mtime = ply_path.stat().st_mtime_ns
+    try:
+        if gz_path.stat().st_mtime_ns >= src_mtime:
+            return gz_path
+    except FileNotFoundError:
+        pass
+
+    # 동시 요청이 반쯤 쓴 파일을 내보내지 않도록 임시 파일에 쓰고 rename
+    tmp_path = gz_path.with_name(f".{gz_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(ply_path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp_path, gz_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return gz_path
+
+
 @router.get("/map/{map_id}/ply")
-async def get_map_ply(map_id: str):
-    ply_path = _resolve_ply_path(map_id)
+async def get_map_ply(
+    map_id: str,
+    request: Request,
+    max_points: Optional[int] = Query(None, ge=1, description="Voxel-downsample to at most this many points"),
+):
+    ply_path = await asyncio.to_thread(_resolve_ply_path, map_id)
     if not ply_path:
         raise HTTPException(status_code=404, detail=f"PLY file not found for map: {map_id}")
 
+    st = await asyncio.to_thread(ply_path.stat)
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    # 인코딩별로 바이트가 다르므로 강한 ETag 도 달라야 함
+    etag = _etag(ply_path, st.st_mtime_ns, st.st_size, max_points, "gzip" if use_gzip else "identity")
+    headers = {"Cache-Control": _CACHE_CONTROL, "ETag": etag, "Vary": "Accept-Encoding"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if max_points is not None:
+        try:
+            data = await asyncio.to_thread(_downsampled_ply, ply_path, max_points)
+        except (OSError, ValueError) as e:
+            logger.warning("[Viewer] PLY downsample failed, sending full cloud: %s", e)
+            data = None
+        if data is not None:
+            # 압축은 GZipMiddleware 가 처리
+            return Response(
+                content=data,
+                media_type="application/octet-stream",
+                headers={**headers, "Content-Disposition": f'attachment; filename="{map_id}.ply"'},
+            )
+
+    # 포인트 좌표는 압축이 잘 되므로 한 번 gzip 해 둔 사본을 그대로 전송
+    # (Content-Encoding 이 있으면 GZipMiddleware 는 다시 압축하지 않음)
+    if use_gzip:
+        try:
+            gz_path = await asyncio.to_thread(_gzipped_ply, ply_path)
+        except OSError as e:
+            logger.warning("[Viewer] PLY gzip failed, sending uncompressed: %s", e)
+            headers["ETag"] = _etag(ply_path, st.st_mtime_ns, st.st_size, "identity")
+        else:
+            return FileResponse(
+                path=str(gz_path),
+                media_type="application/octet-stream",
+                filename=f"{map_id}.ply",
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+
     return FileResponse(
         path=str(ply_path),
         media_type="application/octet-stream",
         filename=f"{map_id}.ply",
+        headers=headers,
     )
 
 
+@router.get("/map/{map_id}/keyframes.bin")
+async def get_map_keyframes_bin(map_id: str):
+    """키프레임 위치를 N x 3 little-endian float32 바이너리로 반환 (뷰어에서 Float32Array 로 바로 사용)"""
+    db_path = await asyncio.to_thread(_resolve_map_db_path, map_id)
+    if not db_path:
+        raise HTTPException(status_code=404, detail=f"Map database not found: {map_id}")
+
+    parsed = await _db_parser.parse_database(str(db_path))
+    keyframes = parsed['keyframes']
+    positions = np.asarray([kf['position'] for kf in keyframes], dtype='<f4').reshape(-1, 3)
+    return Response(content=positions.tobytes(), media_type="application/octet-stream")
+
+
 @router.get("/map/{map_id}/points")
 async def get_map_points(
     map_id: str,
     max_points: int = Query(50000, ge=1, le=200000),
 ):
-    db_path = _resolve_map_db_path(map_id)
+    db_path = await asyncio.to_thread(_resolve_map_db_path, map_id)
     if not db_path:
         raise HTTPException(status_code=404, detail=f"Map database not found: {map_id}")
 
-    parser = DatabaseParser()
-    points = await parser.extract_point_cloud(str(db_path), max_points=max_points)
+    points = await _db_parser.extract_point_cloud(str(db_path), max_points=max_points)
     return {"points": points, "count": len(points)}
 
+
+@router.get("/map/{map_id}/points.bin")
+async def get_map_points_bin(
+    map_id: str,
+    max_points: int = Query(50000, ge=1, le=200000),
+):
+    """/points 와 같은 특징점을 N x 3 little-endian float32 바이너리로 (JSON 대비 약 1/4 크기)"""
+    db_path = await asyncio.to_thread(_resolve_map_db_path, map_id)
+    if not db_path:
+        raise HTTPException(status_code=404, detail=f"Map database not found: {map_id}")
+
+    points = await _db_parser.extract_point_cloud(str(db_path), max_points=max_points)
+    data = np.asarray(points, dtype='<f4').reshape(-1, 3)
+    return Response(content=data.tobytes(), media_type="application/octet-stream")
+
 @router.get("/map/{map_id}", response_class=HTMLResponse)
-async def view_map(map_id: str, pose: Optional[str] = Query(None, description="Camera pose as 'x,y,z'")):
-    db_path = _resolve_map_db_path(map_id)
+async def view_map(
+    map_id: str,
+    request: Request,
+    pose: Optional[str] = Query(None, description="Camera pose as 'x,y,z'"),
+):
+    db_path = await asyncio.to_thread(_resolve_map_db_path, map_id)
     if not db_path:
         raise HTTPException(status_code=404, detail=f"Map database not found: {map_id}")
 
@@ -102,386 +411,66 @@ async def view_map(map_id: str, pose: Optional[str] = Query(None, description="C
             pose_data = None
 
     try:
-        parser = DatabaseParser()
-        parsed = await parser.parse_database(str(db_path))
-        keyframes = parsed['keyframes']
-        num_points = parsed['num_map_points']
-        loop_closures = parsed.get('loop_closures', 0)
-
-        travelled = 0.0
-        if len(keyframes) > 1:
-            for i in range(1, len(keyframes)):
-                p0 = keyframes[i - 1]['position']
-                p1 = keyframes[i]['position']
-                dx = p1[0] - p0[0]
-                dy = p1[1] - p0[1]
-                dz = p1[2] - p0[2]
-                travelled += (dx * dx + dy * dy + dz * dz) ** 0.5
-
-        center_x, center_y, center_z = 0, 0, 0
-        min_y = 0
-        max_y = 0
-        max_span = 5
-
-        if keyframes:
-            positions = [kf['position'] for kf in keyframes]
-            xs = [p[0] for p in positions]
-            ys = [p[1] for p in positions]
-            zs = [p[2] for p in positions]
-            center_x = (min(xs) + max(xs)) / 2
-            center_y = (min(ys) + max(ys)) / 2
-            center_z = (min(zs) + max(zs)) / 2
-            min_y = min(ys)
-            max_y = max(ys)
-            max_span = max(max(xs) - min(xs), max(zs) - min(zs), 2)
-
-        ply_available = _resolve_ply_path(map_id) is not None
-        db_size_mb = os.path.getsize(str(db_path)) / (1024 * 1024)
-
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Indoor Map Viewer - {map_id}</title>
-    <style>
-        body {{ margin: 0; overflow: hidden; background: #1a1a1a; }}
-        canvas {{ display: block; }}
-        #stats {{
-            position: absolute;
-            top: 12px;
-            left: 12px;
-            color: #e0e0e0;
-            background: rgba(0,0,0,0.82);
-            padding: 14px 18px;
-            border-radius: 6px;
-            font: 13px/1.7 'Consolas','Monaco','Courier New',monospace;
-            pointer-events: none;
-            min-width: 260px;
-            z-index: 10;
-        }}
-        #stats .label {{ color: #999; }}
-        #stats .value {{ color: #fff; }}
-        #toggles {{
-            position: absolute;
-            top: 12px;
-            right: 12px;
-            color: #ccc;
-            background: rgba(0,0,0,0.82);
-            padding: 10px 14px;
-            border-radius: 6px;
-            font: 13px/2 sans-serif;
-            z-index: 10;
-        }}
-        #toggles label {{ display: block; cursor: pointer; user-select: none; }}
-        #toggles label:hover {{ color: #4af; }}
-        #controls {{
-            position: absolute;
-            bottom: 12px;
-            left: 12px;
-            color: #888;
-            background: rgba(0,0,0,0.7);
-            padding: 8px 12px;
-            border-radius: 6px;
-            font: 11px/1.5 sans-serif;
-            pointer-events: none;
-        }}
-        #loading {{
-            position: absolute;
-            top: 50%; left: 50%;
-            transform: translate(-50%,-50%);
-            color: #fff;
-            font: 16px sans-serif;
-            z-index: 20;
-        }}
-    </style>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/PLYLoader.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js"></script>
-</head>
-<body>
-    <div id="loading">포인트 클라우드 로딩 중...</div>
-    <div id="stats">
-        <span class="label">Nodes (WM):</span> <span class="value">{len(keyframes)}</span><br>
-        <span class="label">Database (MB):</span> <span class="value">{db_size_mb:.1f}</span><br>
-        <span class="label">Features:</span> <span class="value">{num_points}</span><br>
-        <span class="label" id="points-label">Points:</span> <span class="value" id="points-count">loading...</span><br>
-        <span class="label">Loop closures:</span> <span class="value">{loop_closures}</span><br>
-        <span class="label">Travelled distance:</span> <span class="value">{travelled:.2f} m</span><br>
-        <span class="label">Pose (x,y,z):</span> <span class="value" id="cam-pose">0.00 0.00 0.00</span><br>
-        <span class="label">FPS:</span> <span class="value" id="fps-counter">-</span>
-    </div>
-    <div id="toggles">
-        <label><input type="checkbox" checked data-layer="pointCloud"> 포인트 클라우드</label>
-        <label><input type="checkbox" checked data-layer="trajectory"> 경로</label>
-        <label><input type="checkbox" checked data-layer="keyframes"> 키프레임</label>
-        <label><input type="checkbox" checked data-layer="grid"> 그리드</label>
-        <label><input type="checkbox" data-layer="axes"> 축</label>
-    </div>
-    <div id="controls">
-        좌클릭: 회전 &nbsp;|&nbsp; 우클릭: 이동 &nbsp;|&nbsp; WASD: 전후좌우 &nbsp;|&nbsp; Q/E: 상하 &nbsp;|&nbsp; 스크롤: 전후 &nbsp;|&nbsp; R: 리셋
-    </div>
-    <script>
-        const rt2t = (x, y, z) => [x, y, z];
-
-        const scene = new THREE.Scene();
-        scene.background = new THREE.Color(0x1a1a1a);
-
-        const camera = new THREE.PerspectiveCamera(60, innerWidth / innerHeight, 0.01, 500);
-        const renderer = new THREE.WebGLRenderer({{ antialias: true }});
-        renderer.setSize(innerWidth, innerHeight);
-        renderer.setPixelRatio(devicePixelRatio);
-        document.body.appendChild(renderer.domElement);
-
-        const initRaw = [{center_x}, {center_y}, {center_z}];
-        const initT = rt2t(...initRaw);
-        const camOffsetRaw = [{max_span * 0.8}, {max_span * 0.6}, {max_span * 0.8}];
-        const camPosT = [initT[0] + camOffsetRaw[0], initT[1] + camOffsetRaw[1], initT[2] + camOffsetRaw[2]];
-        camera.position.set(...camPosT);
-        camera.lookAt(...initT);
-
-        const euler = new THREE.Euler(0, 0, 0, 'YXZ');
-        euler.setFromQuaternion(camera.quaternion, 'YXZ');
-        const keys = {{}};
-        let isDragging = false, isPanning = false;
-        let prevX = 0, prevY = 0;
-        const sensitivity = 0.002;
-        const moveSpeed = {max(max_span * 0.03, 0.05)};
-
-        const groups = {{
-            pointCloud: new THREE.Group(),
-            trajectory: new THREE.Group(),
-            keyframes: new THREE.Group(),
-            grid: new THREE.Group(),
-            axes: new THREE.Group()
-        }};
-        Object.values(groups).forEach(g => scene.add(g));
-
-        scene.add(new THREE.AmbientLight(0xffffff, 0.8));
-
-        const gridT = rt2t(0, {min_y} - 0.05, 0);
-        const grid = new THREE.GridHelper(
-            Math.ceil({max_span}) * 2,
-            Math.ceil({max_span}) * 4,
-            0x333333, 0x222222
-        );
-        grid.position.set(...gridT);
-        groups.grid.add(grid);
-
-        const axesT = rt2t({center_x}, {min_y} - 0.05, {center_z});
-        const axes = new THREE.AxesHelper({max(max_span * 0.3, 0.5)});
-        axes.position.set(...axesT);
-        groups.axes.add(axes);
-        groups.axes.visible = false;
-
-        const kfData = {json.dumps(keyframes)};
-        const pathPts = [];
-        kfData.forEach(kf => {{
-            const p = kf.position;
-            pathPts.push(new THREE.Vector3(...rt2t(p[0], p[1], p[2])));
-        }});
-
-        if (pathPts.length > 1) {{
-            const geo = new THREE.BufferGeometry().setFromPoints(pathPts);
-            const mat = new THREE.LineBasicMaterial({{ color: 0x3388ff, linewidth: 2 }});
-            groups.trajectory.add(new THREE.Line(geo, mat));
-
-            const odomGeo = new THREE.BufferGeometry().setFromPoints(pathPts);
-            const odomMat = new THREE.LineBasicMaterial({{ color: 0xff4444, linewidth: 1, opacity: 0.6, transparent: true }});
-            groups.trajectory.add(new THREE.Line(odomGeo, odomMat));
-        }}
-
-        const camGeo = new THREE.SphereGeometry(0.015, 8, 8);
-        const camMat = new THREE.MeshBasicMaterial({{ color: 0x00ff88 }});
-        kfData.forEach(kf => {{
-            const m = new THREE.Mesh(camGeo, camMat);
-            m.position.set(...rt2t(kf.position[0], kf.position[1], kf.position[2]));
-            groups.keyframes.add(m);
-        }});
-
-        const poseData = {json.dumps(pose_data)};
-        if (poseData) {{
-            const geo = new THREE.SphereGeometry(0.05, 16, 16);
-            const mat = new THREE.MeshBasicMaterial({{ color: 0xff0000 }});
-            const marker = new THREE.Mesh(geo, mat);
-            marker.position.set(...rt2t(poseData.x, poseData.y, poseData.z));
-            scene.add(marker);
-        }}
-
-        async function loadPLY() {{
-            const el = document.getElementById('loading');
-            const countEl = document.getElementById('points-count');
-            try {{
-                const resp = await fetch('/api/viewer/map/{map_id}/ply');
-                if (!resp.ok) throw new Error('PLY not available');
-                const buf = await resp.arrayBuffer();
-
-                const loader = new THREE.PLYLoader();
-                const geometry = loader.parse(buf);
-
-                const pos = geometry.getAttribute('position');
-                const n = pos.count;
-                const newPos = new Float32Array(n * 3);
-                for (let i = 0; i < n; i++) {{
-                    const t = rt2t(pos.getX(i), pos.getY(i), pos.getZ(i));
-                    newPos[i * 3] = t[0]; newPos[i * 3 + 1] = t[1]; newPos[i * 3 + 2] = t[2];
-                }}
-                geometry.setAttribute('position', new THREE.BufferAttribute(newPos, 3));
-
-                if (geometry.getAttribute('normal')) {{
-                    const norm = geometry.getAttribute('normal');
-                    const newNorm = new Float32Array(n * 3);
-                    for (let i = 0; i < n; i++) {{
-                        const t = rt2t(norm.getX(i), norm.getY(i), norm.getZ(i));
-                        newNorm[i * 3] = t[0]; newNorm[i * 3 + 1] = t[1]; newNorm[i * 3 + 2] = t[2];
-                    }}
-                    geometry.setAttribute('normal', new THREE.BufferAttribute(newNorm, 3));
-                }}
-
-                geometry.computeBoundingBox();
-
-                const hasColor = !!geometry.getAttribute('color');
-                const mat = new THREE.PointsMaterial({{
-                    size: 2.0,
-                    sizeAttenuation: false,
-                    vertexColors: hasColor
-                }});
-                if (!hasColor) mat.color.set(0xaaaaaa);
-
-                groups.pointCloud.add(new THREE.Points(geometry, mat));
-                countEl.textContent = n.toLocaleString();
-                el.style.display = 'none';
-            }} catch (e) {{
-                console.warn('PLY load failed, falling back to feature points:', e);
-                el.textContent = '특징점 로딩 중...';
-                await loadFallback();
-                el.style.display = 'none';
-            }}
-        }}
-
-        async function loadFallback() {{
-            const countEl = document.getElementById('points-count');
-            try {{
-                const resp = await fetch('/api/viewer/map/{map_id}/points?max_points=100000');
-                const data = await resp.json();
-                const pts = data.points || [];
-                if (!pts.length) {{ countEl.textContent = '0'; return; }}
-
-                const positions = new Float32Array(pts.length * 3);
-                const colors = new Float32Array(pts.length * 3);
-                let minH = Infinity, maxH = -Infinity;
-                pts.forEach(p => {{ if (p[1] < minH) minH = p[1]; if (p[1] > maxH) maxH = p[1]; }});
-                const hR = maxH - minH || 1;
-                pts.forEach((p, i) => {{
-                    const t = rt2t(p[0], p[1], p[2]);
-                    positions[i*3] = t[0]; positions[i*3+1] = t[1]; positions[i*3+2] = t[2];
-                    const c = new THREE.Color(); c.setHSL(0.66 - ((p[1]-minH)/hR)*0.66, 0.9, 0.5);
-                    colors[i*3] = c.r; colors[i*3+1] = c.g; colors[i*3+2] = c.b;
-                }});
-                const geo = new THREE.BufferGeometry();
-                geo.setAttribute('position', new THREE.BufferAttribute(positions, 3));
-                geo.setAttribute('color', new THREE.BufferAttribute(colors, 3));
-                groups.pointCloud.add(new THREE.Points(geo, new THREE.PointsMaterial({{ size: 2, sizeAttenuation: false, vertexColors: true }})));
-                countEl.textContent = pts.length.toLocaleString();
-            }} catch (err) {{
-                console.error(err);
-                countEl.textContent = 'error';
-            }}
-        }}
-
-        loadPLY();
-
-        document.querySelectorAll('#toggles input').forEach(cb => {{
-            cb.addEventListener('change', e => {{
-                const g = groups[e.target.dataset.layer];
-                if (g) g.visible = e.target.checked;
-            }});
-        }});
-
-        renderer.domElement.addEventListener('mousedown', e => {{
-            if (e.button === 0) isDragging = true;
-            if (e.button === 2) isPanning = true;
-            prevX = e.clientX; prevY = e.clientY;
-        }});
-        renderer.domElement.addEventListener('mousemove', e => {{
-            const dx = e.clientX - prevX, dy = e.clientY - prevY;
-            prevX = e.clientX; prevY = e.clientY;
-            if (isDragging) {{
-                euler.y -= dx * sensitivity;
-                euler.x -= dy * sensitivity;
-                euler.x = Math.max(-Math.PI/2, Math.min(Math.PI/2, euler.x));
-                camera.quaternion.setFromEuler(euler);
-            }}
-            if (isPanning) {{
-                const right = new THREE.Vector3();
-                const up = new THREE.Vector3();
-                camera.getWorldDirection(new THREE.Vector3());
-                right.setFromMatrixColumn(camera.matrixWorld, 0);
-                up.setFromMatrixColumn(camera.matrixWorld, 1);
-                camera.position.add(right.multiplyScalar(-dx * sensitivity * 0.5));
-                camera.position.add(up.multiplyScalar(dy * sensitivity * 0.5));
-            }}
-        }});
-        window.addEventListener('mouseup', () => {{ isDragging = false; isPanning = false; }});
-        renderer.domElement.addEventListener('contextmenu', e => e.preventDefault());
-
-        renderer.domElement.addEventListener('wheel', e => {{
-            const dir = new THREE.Vector3();
-            camera.getWorldDirection(dir);
-            camera.position.add(dir.multiplyScalar(-e.deltaY * 0.003));
-        }});
-
-        document.addEventListener('keydown', e => {{
-            keys[e.code] = true;
-            if (e.code === 'KeyR') {{
-                camera.position.set(...camPosT);
-                camera.lookAt(...initT);
-                euler.setFromQuaternion(camera.quaternion, 'YXZ');
-            }}
-        }});
-        document.addEventListener('keyup', e => {{ keys[e.code] = false; }});
-
-        let frames = 0, lastTime = performance.now();
-        function animate() {{
-            requestAnimationFrame(animate);
-
-            const forward = new THREE.Vector3();
-            camera.getWorldDirection(forward);
-            const right = new THREE.Vector3();
-            right.crossVectors(forward, camera.up).normalize();
-
-            if (keys['KeyW']) camera.position.add(forward.clone().multiplyScalar(moveSpeed));
-            if (keys['KeyS']) camera.position.add(forward.clone().multiplyScalar(-moveSpeed));
-            if (keys['KeyA']) camera.position.add(right.clone().multiplyScalar(-moveSpeed));
-            if (keys['KeyD']) camera.position.add(right.clone().multiplyScalar(moveSpeed));
-            if (keys['KeyQ']) camera.position.y -= moveSpeed;
-            if (keys['KeyE']) camera.position.y += moveSpeed;
-
-            frames++;
-            const now = performance.now();
-            if (now - lastTime >= 1000) {{
-                document.getElementById('fps-counter').textContent = frames + ' Hz';
-                frames = 0; lastTime = now;
-            }}
-
-            const cp = camera.position;
-            document.getElementById('cam-pose').textContent =
-                cp.x.toFixed(2) + ' ' + cp.y.toFixed(2) + ' ' + cp.z.toFixed(2);
-
-            renderer.render(scene, camera);
-        }}
-        animate();
-
-        addEventListener('resize', () => {{
-            camera.aspect = innerWidth / innerHeight;
-            camera.updateProjectionMatrix();
-            renderer.setSize(innerWidth, innerHeight);
-        }});
-    </script>
-</body>
-</html>
-        """
-
-        return HTMLResponse(content=html)
+        st = await asyncio.to_thread(os.stat, db_path)
+        key = (st.st_mtime_ns, st.st_size)
+
+        # GZipMiddleware 가 본문을 압축할 수 있으므로 약한 ETag
+        etag = _etag(db_path, *key, _VIEWER_TEMPLATE_MTIME, pose_data and tuple(pose_data.values()), weak=True)
+        headers = {"Cache-Control": _CACHE_CONTROL, "ETag": etag}
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        # 맵 DB 는 빌드 후 바뀌지 않으므로 (mtime, size) 가 같으면 파싱/통계/렌더 결과 재사용
+        with _cache_lock:
+            cached = _view_cache.get(map_id)
+        if cached is None or cached[0] != key:
+            # save_map 이 _meta.json 에 남긴 통계가 현재 DB 와 같으면 DB 파싱 생략
+            stats = await asyncio.to_thread(_saved_view_stats, db_path, st)
+            if stats is None:
+                parsed = await _db_parser.parse_database(str(db_path))
+                keyframes = parsed['keyframes']
+                travelled, center_x, center_y, center_z, min_y, max_y, max_span = trajectory_stats(keyframes)
+                stats = {
+                    "keyframe_count": len(keyframes),
+                    "num_map_points": parsed['num_map_points'],
+                    "loop_closures": parsed.get('loop_closures', 0),
+                    "travelled": travelled,
+                    "center": [center_x, center_y, center_z],
+                    "min_y": min_y,
+                    "max_span": max_span,
+                }
+
+            center_x, center_y, center_z = stats["center"]
+            max_span = stats["max_span"]
+            context = dict(
+                map_id=map_id,
+                num_keyframes=stats["keyframe_count"],
+                db_size_mb=st.st_size / (1024 * 1024),
+                num_points=stats["num_map_points"],
+                loop_closures=stats["loop_closures"],
+                travelled=stats["travelled"],
+                center_x=center_x,
+                center_y=center_y,
+                center_z=center_z,
+                min_y=stats["min_y"],
+                max_span=max_span,
+                move_speed=max(max_span * 0.03, 0.05),
+                axes_size=max(max_span * 0.3, 0.5),
+            )
+            # 응답마다 str -> bytes 인코딩하지 않도록 바이트로 보관
+            cached = (key, context, _VIEWER_TEMPLATE.render(**context, pose_json="null").encode("utf-8"))
+            with _cache_lock:
+                _view_cache[map_id] = cached
+                _view_cache.move_to_end(map_id)
+                while len(_view_cache) > _VIEW_CACHE_SIZE:
+                    _view_cache.popitem(last=False)
+
+        if pose_data is None:
+            return HTMLResponse(content=cached[2], headers=headers)
+
+        # pose 가 있는 요청은 캐시된 컨텍스트로 마커 부분만 다시 렌더
+        html = _VIEWER_TEMPLATE.render(**cached[1], pose_json=orjson.dumps(pose_data).decode())
+        return HTMLResponse(content=html, headers=headers)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
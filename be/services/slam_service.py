@@ -1,8 +1,13 @@
 # services/slam_service.py
+import time
+
 from storage.storage_manager import StorageManager
 
 storage = StorageManager()
 
+# 진행률은 1% 이상 변했거나 이 간격이 지났을 때만 기록 (엔진이 촘촘히 보고해도 메타데이터 쓰기는 적게)
+PROGRESS_MIN_INTERVAL = 0.5
+
 async def process_slam_async(session_id: str, slam_engine):
     """비동기 SLAM 처리"""
     
@@ -16,7 +21,17 @@ async def process_slam_async(session_id: str, slam_engine):
         frames_data = await storage.load_session_data(session_id)
         print(f"로드된 프레임: {len(frames_data['poses'])}개")
         
+        last_emitted = [-1, 0.0]  # [기록한 진행률(정수 %), monotonic 시각]
+        
         async def progress_callback(progress: float):
+            now = time.monotonic()
+            if (
+                progress < 100
+                and int(progress) <= last_emitted[0]
+                and now - last_emitted[1] < PROGRESS_MIN_INTERVAL
+            ):
+                return
+            last_emitted[:] = [int(progress), now]
             await storage.update_progress(session_id, progress)
             print(f"진행률: {progress}%")
         
@@ -1,11 +1,40 @@
 # slam_engines/rtabmap/config_generator.py
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import yaml
 
+try:
+    from yaml import CSafeDumper as _YamlDumper  # libyaml C emitter
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
 from . import constants
 
 
+def _build_cli_args(items) -> Tuple[str, ...]:
+    args = []
+    for key, value in items:
+        args.extend(['-param', key, str(value)])
+    return tuple(args)
+
+
+def _params_key(params: Dict) -> Tuple[Tuple[str, type, object], ...]:
+    # 인자 순서가 CLI 순서가 되므로 items 순서 그대로, 1 == True 처럼 같게 비교되는
+    # 값이 다르게 렌더링되지 않도록 (str(True) == 'True') 값의 타입도 키에 포함
+    return tuple((key, type(value), value) for key, value in params.items())
+
+
+# DEFAULT_PARAMS 는 모듈 상수이므로 import 시 한 번만 변환
+_DEFAULT_PARAMS_KEY = _params_key(constants.DEFAULT_PARAMS)
+_DEFAULT_CLI_ARGS = _build_cli_args(constants.DEFAULT_PARAMS.items())
+
+
+@lru_cache(maxsize=32)
+def _cached_cli_args(key: Tuple[Tuple[str, type, object], ...]) -> Tuple[str, ...]:
+    return _build_cli_args((name, value) for name, _, value in key)
+
+
 class ConfigGenerator:
     """RTAB-Map configuration file generator for standalone mode"""
     
@@ -46,12 +75,12 @@ class ConfigGenerator:
         
         # Write YAML configuration file
         with open(output_file, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(config, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
         
         print(f"[ConfigGenerator] RTAB-Map config generated: {output_path}")
         return str(output_file)
     
-    def params_to_cli_args(self, params: Dict) -> list:
+    def params_to_cli_args(self, params: Optional[Dict] = None) -> list:
         """
         Convert RTAB-Map parameters dictionary to command-line arguments.
         
@@ -59,12 +88,17 @@ class ConfigGenerator:
         to a list like ['-param', 'Mem/IncrementalMemory', 'true', '-param', 'Kp/MaxFeatures', '400']
         
         Args:
-            params: Dictionary of RTAB-Map parameters
+            params: Dictionary of RTAB-Map parameters (None = DEFAULT_PARAMS)
         
         Returns:
             list: Command-line arguments in format ['-param', 'Key', 'value', '-param', 'Key2', 'value2', ...]
         """
-        args = []
-        for key, value in params.items():
-            args.extend(['-param', key, str(value)])
-        return args
+        if params is None:
+            return list(_DEFAULT_CLI_ARGS)
+        key = _params_key(params)
+        if key == _DEFAULT_PARAMS_KEY:
+            return list(_DEFAULT_CLI_ARGS)
+        try:
+            return list(_cached_cli_args(key))
+        except TypeError:  # unhashable value
+            return list(_build_cli_args(params.items()))
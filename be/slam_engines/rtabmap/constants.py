@@ -1,9 +1,16 @@
 # slam_engines/rtabmap/constants.py
+import struct
 
 SLAM_TIMEOUT_SECONDS = 600
 
 DATABASE_FILENAME = "rtabmap.db"
 
+# Node.pose BLOB: row-major 3x4 float32 transform (48 bytes)
+POSE_STRUCT = struct.Struct('<12f')
+
+# Data.calibration BLOB: CameraModel header + K + local transform (164 bytes)
+CALIBRATION_STRUCT = struct.Struct('<3i i 2i 4i i 9d 12f')
+
 DEFAULT_PARAMS = {
     "Mem/IncrementalMemory": "true",
     "Mem/InitWMWithAllNodes": "false",
@@ -1,83 +1,269 @@
 """RTAB-Map database parser for extracting trajectory and map metadata."""
 
-import math
+import asyncio
+import functools
+import os
 import sqlite3
-import struct
-from typing import Dict, List, Optional
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from pathlib import Path
 
+import numpy as np
+
+from .constants import POSE_STRUCT
+
+
+# RTAB-Map stores Node.pose as a row-major 3x4 float32 matrix
+POSE_BLOB_SIZE = POSE_STRUCT.size
+
+# Shared pool for blocking SQLite parses (bounds concurrently open map DBs)
+PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="db-parser")
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a map DB read-only for bulk reads.
+
+    mode=ro skips journal setup and never creates sidecar files. immutable=1
+    is deliberately not used: maps are rewritten in place after rebuilds.
+    No type detection / row factory (plain tuples), autocommit so SELECTs
+    never open an implicit transaction, and bytes for TEXT since only
+    numeric and BLOB columns are read here. mmap lets SQLite serve pages
+    without read() copies on large map DBs.
+    """
+    uri = f"{Path(db_path).absolute().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, detect_types=0, isolation_level=None, check_same_thread=False)
+    conn.row_factory = None
+    conn.text_factory = bytes
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _decode_pose_blobs(buf: bytes) -> np.ndarray:
+    """Decode concatenated pose blobs into an (N, 3, 4) float64 array in one pass."""
+    return np.frombuffer(buf, dtype='<f4').reshape(-1, 3, 4).astype(np.float64)
+
+
+def _rotations_to_quaternions(r: np.ndarray) -> np.ndarray:
+    """(N, 3, 3) rotation matrices -> (N, 4) quaternions [qx, qy, qz, qw].
+
+    All four branches of the usual trace-based conversion are evaluated
+    for every row and the numerically stable one is picked per row.
+    """
+    r11, r12, r13 = r[:, 0, 0], r[:, 0, 1], r[:, 0, 2]
+    r21, r22, r23 = r[:, 1, 0], r[:, 1, 1], r[:, 1, 2]
+    r31, r32, r33 = r[:, 2, 0], r[:, 2, 1], r[:, 2, 2]
+    trace = r11 + r22 + r33
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s0 = 0.5 / np.sqrt(trace + 1.0)
+        s1 = 2.0 * np.sqrt(1.0 + r11 - r22 - r33)
+        s2 = 2.0 * np.sqrt(1.0 + r22 - r11 - r33)
+        s3 = 2.0 * np.sqrt(1.0 + r33 - r11 - r22)
+
+        candidates = np.stack([
+            np.stack([(r32 - r23) * s0, (r13 - r31) * s0, (r21 - r12) * s0, 0.25 / s0], axis=-1),
+            np.stack([0.25 * s1, (r12 + r21) / s1, (r13 + r31) / s1, (r32 - r23) / s1], axis=-1),
+            np.stack([(r12 + r21) / s2, 0.25 * s2, (r23 + r32) / s2, (r13 - r31) / s2], axis=-1),
+            np.stack([(r13 + r31) / s3, (r23 + r32) / s3, 0.25 * s3, (r21 - r12) / s3], axis=-1),
+        ])
+
+    branch = np.where(
+        trace > 0, 0,
+        np.where((r11 > r22) & (r11 > r33), 1,
+                 np.where(r22 > r33, 2, 3))
+    )
+    return candidates[branch, np.arange(len(r))]
+
+
+_COUNTS_SQL = """
+    SELECT (SELECT COUNT(*) FROM Node),
+           (SELECT COUNT(*) FROM Link WHERE type=2),
+           (SELECT COUNT(*) FROM Feature)
+"""
+
+
+def _read_counts(db_path: str) -> Dict:
+    """Read only node / loop closure / feature counts (raises on failure)."""
+    conn = _connect(db_path)
+    try:
+        num_nodes, num_loops, num_features = conn.execute(_COUNTS_SQL).fetchone()
+    finally:
+        conn.close()
+    return {
+        'num_keyframes': num_nodes,
+        'num_map_points': num_features,
+        'loop_closures': num_loops
+    }
+
+
+def _read_database(db_path: str, keyframe_limit: int) -> Dict:
+    """Read counts and keyframe poses from an RTAB-Map DB (raises on failure)."""
+    conn = None
+    try:
+        conn = _connect(db_path)
+
+        num_nodes, num_loops, num_features = conn.execute(_COUNTS_SQL).fetchone()
+
+        # Node.id is the INTEGER PRIMARY KEY (rowid alias), so a plain scan
+        # already yields id order; no ORDER BY / sort step needed.
+        # LIMIT 은 포즈 유무와 관계없이 앞쪽 노드에 적용되도록 서브쿼리에서.
+        source = "Node"
+        if keyframe_limit > 0:
+            source = f"(SELECT id, pose, stamp FROM Node LIMIT {int(keyframe_limit)})"
+        cursor = conn.execute(
+            f"SELECT id, substr(pose, 1, {POSE_BLOB_SIZE}), stamp FROM {source} "
+            f"WHERE length(pose) >= {POSE_BLOB_SIZE}"
+        )
+        cursor.arraysize = 4096
+
+        # Node 행을 배치로 스트리밍: 길이 검사/자르기는 SQLite 가 하고,
+        # 배치마다 C 레벨 join/extend 로 연속 버퍼에 누적 (행 단위 Python 루프 없음)
+        pose_buf = bytearray()
+        node_ids = array('q')
+        timestamps = []
+        while True:
+            batch = cursor.fetchmany()
+            if not batch:
+                break
+            batch_ids, batch_poses, batch_stamps = zip(*batch)
+            pose_buf += b"".join(batch_poses)
+            node_ids.extend(batch_ids)
+            timestamps.extend(batch_stamps)
+
+        keyframes = []
+        if node_ids:
+            poses = _decode_pose_blobs(pose_buf)
+            ids = np.frombuffer(node_ids, dtype=np.int64)
+            if np.any(ids[1:] < ids[:-1]):
+                # Non-standard DB without rowid ordering: restore id order
+                order = np.argsort(ids, kind='stable')
+                poses = poses[order]
+                node_ids = ids[order].tolist()
+                timestamps = [timestamps[i] for i in order]
+            translations = poses[:, :, 3].tolist()
+            quaternions = _rotations_to_quaternions(poses[:, :, :3]).tolist()
+            for node_id, timestamp, translation, quaternion in zip(node_ids, timestamps, translations, quaternions):
+                keyframes.append({
+                    'id': node_id,
+                    'timestamp': timestamp,
+                    'position': translation,
+                    'orientation': quaternion
+                })
+
+        return {
+            'num_keyframes': num_nodes,
+            'num_map_points': num_features,
+            'keyframes': keyframes,
+            'loop_closures': num_loops
+        }
+    finally:
+        if conn:
+            conn.close()
+
+
+# Full keyframe lists are large; listing endpoints use read_counts_sync instead
+@functools.lru_cache(maxsize=8)
+def _parse_database_cached(db_path: str, mtime_ns: int, size: int, keyframe_limit: int) -> Dict:
+    """mtime_ns / size only key the cache so a rewritten DB is parsed again."""
+    return _read_database(db_path, keyframe_limit)
+
 
 class DatabaseParser:
     """Parser for RTAB-Map SQLite database (.db files)."""
 
-    async def extract_point_cloud(self, db_path: str, max_points: int = 50000) -> List[List[float]]:
-        """Extract 3D feature points transformed to world coordinates."""
+    def extract_point_cloud_sync(self, db_path: str, max_points: int = 50000) -> List[List[float]]:
+        """Extract 3D feature points transformed to world coordinates (blocking)."""
         if not Path(db_path).exists() or max_points <= 0:
             return []
 
         conn = None
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            conn = _connect(db_path)
 
-            cursor.execute(
+            (num_features,) = conn.execute(
                 """
-                SELECT node_id, depth_x, depth_y, depth_z
-                FROM Feature
+                SELECT COUNT(*) FROM Feature
                 WHERE depth_x IS NOT NULL
                   AND depth_y IS NOT NULL
                   AND depth_z IS NOT NULL
                 """
-            )
-            feature_rows = cursor.fetchall()
-
-            if not feature_rows:
+            ).fetchone()
+            if not num_features:
                 return []
 
-            cursor.execute("SELECT id, pose FROM Node")
-            pose_rows = cursor.fetchall()
-
-            pose_by_node: Dict[int, tuple] = {}
-            for node_id, pose_blob in pose_rows:
-                if not pose_blob or len(pose_blob) < 48:
-                    continue
-                pose_by_node[node_id] = struct.unpack('12f', pose_blob[:48])
-
-            if not pose_by_node:
+            # 균등 샘플링과 포즈 조인을 SQLite 에서 처리 (Python 쪽에는 max_points 행만 올라옴).
+            # depth 가 있는 행에 0부터 매긴 순번 k 로 샘플링해야 NULL 행/삭제된 rowid 와 무관하게
+            # 기존 feature_rows[int(i * n / m)] 와 같은 균등 간격이 됨:
+            # k 가 선택되는 조건은 ceil((k + 1) * m / n) > ceil(k * m / n)
+            rows = conn.execute(
+                f"""
+                WITH sampled AS (
+                    SELECT node_id, depth_x, depth_y, depth_z,
+                           ROW_NUMBER() OVER (ORDER BY rowid) - 1 AS k
+                    FROM Feature
+                    WHERE depth_x IS NOT NULL
+                      AND depth_y IS NOT NULL
+                      AND depth_z IS NOT NULL
+                )
+                SELECT f.depth_x, f.depth_y, f.depth_z, substr(n.pose, 1, {POSE_BLOB_SIZE})
+                FROM sampled f
+                JOIN Node n ON n.id = f.node_id
+                WHERE ((f.k + 1) * :m + :n - 1) / :n > (f.k * :m + :n - 1) / :n
+                  AND length(n.pose) >= {POSE_BLOB_SIZE}
+                ORDER BY f.k
+                """,
+                {"m": min(max_points, num_features), "n": num_features},
+            ).fetchall()
+            if not rows:
                 return []
 
-            if len(feature_rows) > max_points:
-                step = len(feature_rows) / float(max_points)
-                sampled_rows = [feature_rows[int(i * step)] for i in range(max_points)]
-            else:
-                sampled_rows = feature_rows
-
-            points: List[List[float]] = []
-            for node_id, depth_x, depth_y, depth_z in sampled_rows:
-                pose = pose_by_node.get(node_id)
-                if pose is None:
-                    continue
-
-                r11, r12, r13, tx = pose[0], pose[1], pose[2], pose[3]
-                r21, r22, r23, ty = pose[4], pose[5], pose[6], pose[7]
-                r31, r32, r33, tz = pose[8], pose[9], pose[10], pose[11]
-
-                world_x = r11 * depth_x + r12 * depth_y + r13 * depth_z + tx
-                world_y = r21 * depth_x + r22 * depth_y + r23 * depth_z + ty
-                world_z = r31 * depth_x + r32 * depth_y + r33 * depth_z + tz
+            xs, ys, zs, pose_blobs = zip(*rows)
+            xyz = np.column_stack([xs, ys, zs]).astype(np.float64)
+            poses = _decode_pose_blobs(b"".join(pose_blobs))
 
-                points.append([world_x, world_y, world_z])
-
-            return points
+            world = np.einsum('nij,nj->ni', poses[:, :, :3], xyz) + poses[:, :, 3]
+            return world.tolist()
         except Exception as e:
             print(f"[RTAB-Map] Point cloud extraction error: {e}")
             return []
         finally:
             if conn:
                 conn.close()
+
+    async def extract_point_cloud(self, db_path: str, max_points: int = 50000) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            PARSE_EXECUTOR, self.extract_point_cloud_sync, db_path, max_points
+        )
     
-    async def parse_database(self, db_path: str, keyframe_limit: int = 0) -> Dict:
-        if not Path(db_path).exists():
+    def read_counts_sync(self, db_path: str) -> Dict:
+        """Keyframe / map point / loop closure counts only (no pose decoding, not cached)."""
+        try:
+            return _read_counts(db_path)
+        except Exception as e:
+            print(f"[RTAB-Map] DB count error: {e}")
+            return {
+                'num_keyframes': 0,
+                'num_map_points': 0,
+                'loop_closures': 0,
+                'error': str(e)
+            }
+
+    def parse_database_sync(self, db_path: str, keyframe_limit: int = 0, use_cache: bool = True) -> Dict:
+        """Blocking variant of parse_database.
+
+        Results are cached per (path, mtime, size), so unchanged maps are
+        parsed once per process. The returned 'keyframes' list is shared with
+        the cache and must be treated as read-only. Pass use_cache=False for
+        one-off DBs (e.g. temporary copies) that will never be parsed again.
+        """
+        try:
+            stat = os.stat(db_path)
+        except OSError:
             return {
                 'num_keyframes': 0,
                 'num_map_points': 0,
@@ -86,43 +272,11 @@ class DatabaseParser:
             }
         
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM Node")
-            num_nodes = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM Link WHERE type=2")
-            num_loops = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM Feature")
-            num_features = cursor.fetchone()[0]
-            
-            keyframes = []
-            query = "SELECT id, pose, stamp FROM Node ORDER BY id"
-            if keyframe_limit > 0:
-                query += f" LIMIT {keyframe_limit}"
-            cursor.execute(query)
-            
-            for node_id, pose_blob, timestamp in cursor.fetchall():
-                if pose_blob:
-                    pose = self._parse_pose_blob(pose_blob)
-                    if pose:
-                        keyframes.append({
-                            'id': node_id,
-                            'timestamp': timestamp,
-                            'position': pose['position'],
-                            'orientation': pose['orientation']
-                        })
-            
-            conn.close()
-            
-            return {
-                'num_keyframes': num_nodes,
-                'num_map_points': num_features,
-                'keyframes': keyframes,
-                'loop_closures': num_loops
-            }
+            if not use_cache:
+                return _read_database(str(db_path), keyframe_limit)
+            return dict(_parse_database_cached(
+                str(db_path), stat.st_mtime_ns, stat.st_size, keyframe_limit
+            ))
         except Exception as e:
             print(f"[RTAB-Map] DB parse error: {e}")
             return {
@@ -133,50 +287,11 @@ class DatabaseParser:
                 'error': str(e)
             }
     
-    def _parse_pose_blob(self, blob: bytes) -> Optional[Dict]:
-        try:
-            if len(blob) < 48:
-                return None
-            
-            values = struct.unpack('12f', blob[:48])
-            
-            r11, r12, r13 = values[0], values[1], values[2]
-            r21, r22, r23 = values[4], values[5], values[6]
-            r31, r32, r33 = values[8], values[9], values[10]
-            tx, ty, tz = values[3], values[7], values[11]
-            
-            trace = r11 + r22 + r33
-            if trace > 0:
-                s = 0.5 / math.sqrt(trace + 1.0)
-                qw = 0.25 / s
-                qx = (r32 - r23) * s
-                qy = (r13 - r31) * s
-                qz = (r21 - r12) * s
-            elif r11 > r22 and r11 > r33:
-                s = 2.0 * math.sqrt(1.0 + r11 - r22 - r33)
-                qw = (r32 - r23) / s
-                qx = 0.25 * s
-                qy = (r12 + r21) / s
-                qz = (r13 + r31) / s
-            elif r22 > r33:
-                s = 2.0 * math.sqrt(1.0 + r22 - r11 - r33)
-                qw = (r13 - r31) / s
-                qx = (r12 + r21) / s
-                qy = 0.25 * s
-                qz = (r23 + r32) / s
-            else:
-                s = 2.0 * math.sqrt(1.0 + r33 - r11 - r22)
-                qw = (r21 - r12) / s
-                qx = (r13 + r31) / s
-                qy = (r23 + r32) / s
-                qz = 0.25 * s
-            
-            return {
-                'position': [tx, ty, tz],
-                'orientation': [qx, qy, qz, qw]
-            }
-        except Exception:
-            return None
+    async def parse_database(self, db_path: str, keyframe_limit: int = 0, use_cache: bool = True) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            PARSE_EXECUTOR, self.parse_database_sync, db_path, keyframe_limit, use_cache
+        )
     
     async def export_trajectory(self, db_path: str, output_path: str):
         """
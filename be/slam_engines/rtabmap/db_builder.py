@@ -6,15 +6,22 @@ can compute odometry and optimization with full RGB-D data.
 """
 
 import sqlite3
-import struct
 import os
 import json
+import mmap
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional
 
 import cv2
 import numpy as np
 
+from .constants import CALIBRATION_STRUCT, POSE_STRUCT
+
 
 RTABMAP_DB_VERSION = "0.22.0"
 
@@ -162,6 +169,22 @@ CREATE INDEX IF NOT EXISTS IDX_Link_from_id ON Link (from_id);
 """
 
 
+# SCHEMA_SQL 을 프로세스당 한 번만 파싱해 둔 메모리 DB (새 DB 는 backup 으로 페이지째 복사)
+_schema_template: Optional[sqlite3.Connection] = None
+_schema_template_lock = threading.Lock()
+
+
+def _copy_schema(dst: sqlite3.Connection) -> None:
+    """빈 스키마 템플릿을 dst 로 복사 (executescript 로 DDL 을 매번 다시 파싱하지 않음)"""
+    global _schema_template
+    with _schema_template_lock:
+        if _schema_template is None:
+            template = sqlite3.connect(":memory:", check_same_thread=False)
+            template.executescript(SCHEMA_SQL)
+            _schema_template = template
+        _schema_template.backup(dst)
+
+
 def build_calibration_blob(
     fx: float, fy: float, cx: float, cy: float,
     width: int, height: int
@@ -179,8 +202,7 @@ def build_calibration_blob(
         1.0, 0.0, 0.0, 0.0,
     ]
 
-    blob = struct.pack(
-        '<3i i 2i 4i i 9d 12f',
+    blob = CALIBRATION_STRUCT.pack(
         0, 22, 0,           # version
         0,                   # type
         width, height,       # image size
@@ -192,13 +214,19 @@ def build_calibration_blob(
     return blob
 
 
+_IDENTITY_POSE = POSE_STRUCT.pack(
+    1.0, 0.0, 0.0, 0.0,
+    0.0, 1.0, 0.0, 0.0,
+    0.0, 0.0, 1.0, 0.0,
+)
+
+
 def build_identity_pose() -> bytes:
     """3x4 identity transform as 12 floats (48 bytes)."""
-    return struct.pack('<12f',
-        1.0, 0.0, 0.0, 0.0,
-        0.0, 1.0, 0.0, 0.0,
-        0.0, 0.0, 1.0, 0.0,
-    )
+    return _IDENTITY_POSE
+
+
+_DEPTH_PNG_PARAMS = [int(cv2.IMWRITE_PNG_COMPRESSION), 1]
 
 
 def load_and_resize_depth(depth_path: str, target_w: int, target_h: int) -> Optional[bytes]:
@@ -207,20 +235,62 @@ def load_and_resize_depth(depth_path: str, target_w: int, target_h: int) -> Opti
     Returns compressed PNG bytes at target resolution, or None if file
     is missing / empty.
     """
-    if not os.path.exists(depth_path):
-        return None
-
-    depth = cv2.imread(depth_path, cv2.IMREAD_UNCHANGED)
+    with open(depth_path, 'rb') as f:
+        raw = f.read()
+    depth = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_UNCHANGED)
     if depth is None or depth.size == 0 or depth.max() == 0:
         return None
 
-    if depth.shape[1] != target_w or depth.shape[0] != target_h:
-        depth = cv2.resize(depth, (target_w, target_h), interpolation=cv2.INTER_NEAREST)
+    # 이미 목표 해상도면 원본 PNG 를 그대로 사용 (재인코딩 생략)
+    if depth.shape[1] == target_w and depth.shape[0] == target_h:
+        return raw
 
-    _, buf = cv2.imencode('.png', depth)
+    depth = cv2.resize(depth, (target_w, target_h), interpolation=cv2.INTER_NEAREST)
+    # rtabmap-reprocess 가 곧바로 디코드하므로 압축률보다 인코딩 속도 우선
+    _, buf = cv2.imencode('.png', depth, _DEPTH_PNG_PARAMS)
     return buf.tobytes()
 
 
+@contextmanager
+def _mapped_file(path: Path) -> Iterator[memoryview]:
+    """파일 내용을 읽기 전용 mmap memoryview 로 (read() 로 사용자 버퍼에 복사하지 않음)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+# 이보다 프레임이 적으면 프로세스 풀 기동 비용이 더 큼
+_DEPTH_POOL_MIN_FRAMES = 32
+
+
+def _iter_depths(depth_paths: List[str], target_w: int, target_h: int) -> Iterator[Optional[bytes]]:
+    """depth_paths 순서대로 load_and_resize_depth 결과를 반환.
+
+    PNG 디코드/리사이즈/인코딩은 CPU 바운드이므로 프레임이 많으면 프로세스 풀에서
+    병렬 처리하고, 호출 측(메인 스레드)은 그동안 이미지 읽기와 SQLite 삽입을 진행.
+    """
+    workers = os.cpu_count() or 1
+    if len(depth_paths) < _DEPTH_POOL_MIN_FRAMES or workers < 2:
+        for path in depth_paths:
+            yield load_and_resize_depth(path, target_w, target_h)
+        return
+
+    # 스레드가 떠 있는 서버 프로세스에서 fork 하지 않도록 spawn
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        yield from executor.map(
+            partial(load_and_resize_depth, target_w=target_w, target_h=target_h),
+            depth_paths,
+            chunksize=8,
+        )
+
+
 def build_database(
     session_path: str,
     intrinsics: Dict,
@@ -251,8 +321,10 @@ def build_database(
     if output_db is None:
         output_db = str(session / "rtabmap_input.db")
 
-    if os.path.exists(output_db):
+    try:
         os.remove(output_db)
+    except FileNotFoundError:
+        pass
 
     fx = intrinsics['fx']
     fy = intrinsics['fy']
@@ -266,17 +338,28 @@ def build_database(
 
     frame_meta = _load_frame_metadata(chunks_dir)
 
-    image_files = sorted([
-        f for f in os.listdir(images_dir)
-        if f.lower().endswith(('.jpg', '.jpeg', '.png'))
-    ])
+    # 디렉토리를 한 번씩만 읽고 이후 존재 여부는 이름 집합으로 판정 (프레임당 stat 제거)
+    image_files = sorted(
+        entry.name for entry in os.scandir(images_dir)
+        if entry.is_file() and entry.name.lower().endswith(('.jpg', '.jpeg', '.png'))
+    )
+    depth_files = set()
+    if not monocular and depth_dir.is_dir():
+        depth_files = {entry.name for entry in os.scandir(depth_dir)}
 
     print(f"[DB Builder] Building database: {len(image_files)} images found, "
           f"intrinsics {img_w}x{img_h} fx={fx:.1f} fy={fy:.1f}")
 
     conn = sqlite3.connect(output_db)
-    conn.executescript(SCHEMA_SQL)
-
+    # 새로 만드는 빌드 산출물이므로 저널/fsync 불필요 (실패 시 파일을 다시 만듦).
+    # WAL 은 -wal/-shm 사이드카가 남아 rtabmap-reprocess 컨테이너로 넘기기 번거로워 쓰지 않음
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    _copy_schema(conn)
+
+    conn.execute("BEGIN")
     conn.execute(
         "INSERT INTO Admin (version) VALUES (?)",
         (RTABMAP_DB_VERSION,)
@@ -284,39 +367,51 @@ def build_database(
 
     skipped = 0
     node_id = 0
-    for img_file in image_files:
-        stem = Path(img_file).stem
+    nodes = []
 
-        depth_data = None
-        if not monocular:
-            depth_file = stem + ".png"
-            depth_path = str(depth_dir / depth_file)
-            depth_data = load_and_resize_depth(depth_path, img_w, img_h)
+    depth_names = [] if monocular else [
+        Path(f).stem + ".png" for f in image_files if Path(f).stem + ".png" in depth_files
+    ]
+    depths = _iter_depths([str(depth_dir / name) for name in depth_names], img_w, img_h)
 
-            if depth_data is None:
-                skipped += 1
-                continue
+    def iter_frames():
+        """Data 행을 하나씩 생성 (이미지 바이트를 전부 메모리에 모으지 않고 executemany 로 스트리밍)"""
+        nonlocal skipped, node_id
+        for img_file in image_files:
+            stem = Path(img_file).stem
 
-        node_id += 1
+            depth_data = None
+            if not monocular:
+                depth_file = stem + ".png"
+                if depth_file in depth_files:
+                    depth_data = next(depths)
 
-        img_path = str(images_dir / img_file)
-        with open(img_path, 'rb') as f:
-            image_data = f.read()
+                if depth_data is None:
+                    skipped += 1
+                    continue
 
-        meta = frame_meta.get(stem, {})
-        stamp = meta.get('timestamp', 0.0)
-        if stamp > 0:
-            stamp = stamp / 1000.0
+            node_id += 1
 
-        conn.execute(
-            "INSERT INTO Node (id, map_id, weight, stamp, pose) VALUES (?, 0, 0, ?, ?)",
-            (node_id, stamp, identity_pose)
-        )
+            meta = frame_meta.get(stem, {})
+            stamp = meta.get('timestamp', 0.0)
+            if stamp > 0:
+                stamp = stamp / 1000.0
 
-        conn.execute(
-            "INSERT INTO Data (id, image, depth, calibration) VALUES (?, ?, ?, ?)",
-            (node_id, image_data, depth_data, calib_blob)
-        )
+            nodes.append((node_id, stamp, identity_pose))
+
+            # SQLite 가 바인딩 시 페이지 캐시에서 바로 복사하도록 mmap 으로 전달.
+            # executemany 는 다음 행을 요청하기 전에 현재 행을 삽입하므로 yield 뒤에 해제해도 안전
+            with _mapped_file(images_dir / img_file) as image_data:
+                yield (node_id, image_data, depth_data, calib_blob)
+
+    conn.executemany(
+        "INSERT INTO Data (id, image, depth, calibration) VALUES (?, ?, ?, ?)",
+        iter_frames()
+    )
+    conn.executemany(
+        "INSERT INTO Node (id, map_id, weight, stamp, pose) VALUES (?, 0, 0, ?, ?)",
+        nodes
+    )
 
     print(f"[DB Builder] Inserted {node_id} frames, skipped {skipped} ({'monocular mode' if monocular else 'no valid depth'})")
 
@@ -352,7 +447,7 @@ def _load_frame_metadata(chunks_dir: Path) -> Dict[str, Dict]:
         if not chunk_file.suffix == '.json':
             continue
         try:
-            with open(chunk_file) as f:
+            with open(chunk_file, encoding='utf-8') as f:
                 frames = json.load(f)
             for frame in frames:
                 img_path = frame.get('image_path', '')
@@ -25,6 +25,16 @@ from typing import List
 import logging
 
 
+def _localize_in_worker(map_id: str, images: List[bytes], intrinsics: Optional[Dict],
+                        db_path: Optional[str], mask_persons: bool) -> dict:
+    """ProcessPoolExecutor 워커에서 실행되는 localize (모듈 최상위 함수여야 pickle 가능).
+
+    MapManager 는 프로세스별 싱글턴이므로 맵은 워커마다 첫 요청 때 한 번 로드된다.
+    """
+    from .map_manager import MapManager
+    return MapManager().localize(map_id, images, intrinsics, db_path=db_path, mask_persons=mask_persons)
+
+
 class RTABMapEngine(SLAMEngineBase):
     """RTAB-Map SLAM engine.
     
@@ -52,6 +62,8 @@ class RTABMapEngine(SLAMEngineBase):
         
         self.config_generator = ConfigGenerator()
         self.database_parser = DatabaseParser()
+        # localize 를 실행할 executor (None 이면 기본 스레드 풀, 앱 lifespan 에서 프로세스 풀 지정 가능)
+        self.localize_executor = None
         
         # Validate environment
         self._validate_environment()
@@ -145,7 +157,7 @@ class RTABMapEngine(SLAMEngineBase):
             blob = row[0]
             
             # Validate BLOB size
-            expected_size = struct.calcsize('<3i i 2i 4i i 9d 12f')
+            expected_size = constants.CALIBRATION_STRUCT.size
             if len(blob) != expected_size:
                 raise ValueError(
                     f"Invalid calibration BLOB size: {len(blob)} bytes (expected {expected_size} bytes)"
@@ -161,7 +173,7 @@ class RTABMapEngine(SLAMEngineBase):
             #   i = localTransformSize (4 bytes)
             #   9d = K matrix (72 bytes)
             #   12f = LocalTransform (48 bytes)
-            data = struct.unpack('<3i i 2i 4i i 9d 12f', blob)
+            data = constants.CALIBRATION_STRUCT.unpack_from(blob)
             
             # Extract header values
             # version = data[0:3]  # Not used for intrinsics
@@ -422,7 +434,8 @@ class RTABMapEngine(SLAMEngineBase):
             if progress_callback:
                 await progress_callback(90)
             
-            parsed = await self.database_parser.parse_database(output_db)
+            # 세션 작업 DB 는 처리 후 다시 파싱하지 않으므로 캐시하지 않음
+            parsed = await self.database_parser.parse_database(output_db, use_cache=False)
             map_binary = await self._load_map_file(output_db)
             
             if progress_callback:
@@ -674,8 +687,15 @@ class RTABMapEngine(SLAMEngineBase):
         import functools
         from .map_manager import MapManager
 
-        mgr = MapManager()
         loop = asyncio.get_event_loop()
+        if self.localize_executor is not None:
+            # 프로세스 풀: 워커 프로세스마다 자체 MapManager (인자/결과는 pickle)
+            return await loop.run_in_executor(
+                self.localize_executor, _localize_in_worker,
+                map_id, images, intrinsics, db_path, mask_persons,
+            )
+
+        mgr = MapManager()
         result = await loop.run_in_executor(
             None, functools.partial(mgr.localize, map_id, images, intrinsics, db_path=db_path, mask_persons=mask_persons)
         )
@@ -772,7 +792,6 @@ class RTABMapEngine(SLAMEngineBase):
         return pose, confidence, num_matches
     
     def _extract_node_pose(self, db_path: Path, node_id: int) -> Optional[List[float]]:
-        import struct
         import math
         
         try:
@@ -789,11 +808,11 @@ class RTABMapEngine(SLAMEngineBase):
             
             pose_blob = row[1]
             
-            if len(pose_blob) != 48:
+            if len(pose_blob) != constants.POSE_STRUCT.size:
                 print(f"[RTAB-Map] Unexpected pose blob size: {len(pose_blob)} (expected 48)")
                 return None
             
-            data = struct.unpack('<12f', pose_blob)
+            data = constants.POSE_STRUCT.unpack(pose_blob)
             
             r11, r12, r13, tx = data[0], data[1], data[2], data[3]
             r21, r22, r23, ty = data[4], data[5], data[6], data[7]
@@ -6,7 +6,6 @@ loaded in memory. Supports GFTT/BRIEF, SIFT, ORB with easy switching.
 """
 
 import sqlite3
-import struct
 import threading
 import time
 import logging
@@ -19,6 +18,8 @@ from PIL import Image
 import io
 
 from config.settings import settings
+from .constants import POSE_STRUCT
+from .database_parser import _rotations_to_quaternions
 
 logger = logging.getLogger(__name__)
 
@@ -59,46 +60,10 @@ def _decode_image_with_exif(img_bytes: bytes) -> Optional[np.ndarray]:
 _FLOAT_DESCRIPTOR_STRATEGIES = {0, 1, 9}  # SURF, SIFT, KAZE
 
 
-def _parse_pose_blob(blob: bytes) -> Optional[List[float]]:
-    """Parse 48-byte pose BLOB (3x4 transform matrix) to [x,y,z,qx,qy,qz,qw]."""
-    if not blob or len(blob) != 48:
-        return None
-
-    values = struct.unpack('<12f', blob)
-    if all(v == 0.0 for v in values):
-        return None
-
-    r00, r01, r02, tx = values[0:4]
-    r10, r11, r12, ty = values[4:8]
-    r20, r21, r22, tz = values[8:12]
-
-    trace = r00 + r11 + r22
-    if trace > 0:
-        s = 0.5 / (trace + 1.0) ** 0.5
-        qw = 0.25 / s
-        qx = (r21 - r12) * s
-        qy = (r02 - r20) * s
-        qz = (r10 - r01) * s
-    elif r00 > r11 and r00 > r22:
-        s = 2.0 * (1.0 + r00 - r11 - r22) ** 0.5
-        qw = (r21 - r12) / s
-        qx = 0.25 * s
-        qy = (r01 + r10) / s
-        qz = (r02 + r20) / s
-    elif r11 > r22:
-        s = 2.0 * (1.0 + r11 - r00 - r22) ** 0.5
-        qw = (r02 - r20) / s
-        qx = (r01 + r10) / s
-        qy = 0.25 * s
-        qz = (r12 + r21) / s
-    else:
-        s = 2.0 * (1.0 + r22 - r00 - r11) ** 0.5
-        qw = (r10 - r01) / s
-        qx = (r02 + r20) / s
-        qy = (r12 + r21) / s
-        qz = 0.25 * s
-
-    return [tx, ty, tz, qx, qy, qz, qw]
+def _poses_from_blob_array(poses: np.ndarray) -> np.ndarray:
+    """(N, 12) pose rows (3x4 transform) -> (N, 7) [x, y, z, qx, qy, qz, qw] in one vectorized pass."""
+    mats = poses.reshape(-1, 3, 4)
+    return np.concatenate([mats[:, :, 3], _rotations_to_quaternions(mats[:, :, :3])], axis=1)
 
 
 class LoadedMap:
@@ -165,13 +130,20 @@ class LoadedMap:
         rows = conn.execute(
             "SELECT id, pose FROM Node WHERE pose IS NOT NULL"
         ).fetchall()
-        for node_id, pose_blob in rows:
-            pose = _parse_pose_blob(pose_blob)
-            if pose:
+        rows = [(node_id, blob) for node_id, blob in rows if blob and len(blob) == POSE_STRUCT.size]
+        if not rows:
+            return
+        # Decode all blobs and convert every rotation to a quaternion in one NumPy pass
+        node_ids = [node_id for node_id, _ in rows]
+        values = np.frombuffer(b"".join(blob for _, blob in rows), dtype='<f4').reshape(-1, 12).astype(np.float64)
+        valid = values.any(axis=1)  # all-zero blobs are unset poses
+        poses = _poses_from_blob_array(values).tolist()
+        transforms = values.reshape(-1, 3, 4)
+        for node_id, pose, transform, ok in zip(node_ids, poses, transforms, valid.tolist()):
+            if ok:
                 self.node_poses[node_id] = pose
                 # Store raw 3x4 transform matrix for local→world conversion
-                values = struct.unpack('<12f', pose_blob)
-                self.node_transforms[node_id] = np.array(values, dtype=np.float64).reshape(3, 4)
+                self.node_transforms[node_id] = transform
 
     def _load_descriptors(self, conn: sqlite3.Connection):
         rows = conn.execute(
@@ -434,38 +406,9 @@ class MapManager:
                 # [r00 r01 r02 tx]
                 # [r10 r11 r12 ty]
                 # [r20 r21 r22 tz]
-                # Then use _parse_pose_blob logic for quaternion
-                r00, r01, r02 = R_cw[0, 0], R_cw[0, 1], R_cw[0, 2]
-                r10, r11, r12 = R_cw[1, 0], R_cw[1, 1], R_cw[1, 2]
-                r20, r21, r22 = R_cw[2, 0], R_cw[2, 1], R_cw[2, 2]
-                tx, ty, tz = t_cw[0], t_cw[1], t_cw[2]
-
-                # Quaternion from rotation matrix (same as _parse_pose_blob)
-                trace = r00 + r11 + r22
-                if trace > 0:
-                    s = 0.5 / (trace + 1.0) ** 0.5
-                    qw = 0.25 / s
-                    qx = (r21 - r12) * s
-                    qy = (r02 - r20) * s
-                    qz = (r10 - r01) * s
-                elif r00 > r11 and r00 > r22:
-                    s = 2.0 * (1.0 + r00 - r11 - r22) ** 0.5
-                    qw = (r21 - r12) / s
-                    qx = 0.25 * s
-                    qy = (r01 + r10) / s
-                    qz = (r02 + r20) / s
-                elif r11 > r22:
-                    s = 2.0 * (1.0 + r11 - r00 - r22) ** 0.5
-                    qw = (r02 - r20) / s
-                    qx = (r01 + r10) / s
-                    qy = 0.25 * s
-                    qz = (r12 + r21) / s
-                else:
-                    s = 2.0 * (1.0 + r22 - r00 - r11) ** 0.5
-                    qw = (r10 - r01) / s
-                    qx = (r02 + r20) / s
-                    qy = (r12 + r21) / s
-                    qz = 0.25 * s
+                # and convert it the same way as the map's node poses
+                transform = np.hstack([R_cw, t_cw.reshape(3, 1)]).reshape(1, 12)
+                tx, ty, tz, qx, qy, qz, qw = _poses_from_blob_array(transform)[0].tolist()
 
                 # Ensure consistent sign (qw positive convention)
                 if qw < 0:
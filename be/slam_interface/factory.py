@@ -1,10 +1,14 @@
 # slam_interface/factory.py
+import threading
+
 from .base import SLAMEngineBase
 
 class SLAMEngineFactory:
     """SLAM 엔진 팩토리"""
     
     _engines = {}
+    _instances = {}
+    _instances_lock = threading.Lock()
     
     @classmethod
     def register(cls, name: str, engine_class):
@@ -21,6 +25,21 @@ class SLAMEngineFactory:
         
         return engine_class()
     
+    @classmethod
+    def get(cls, engine_type: str) -> SLAMEngineBase:
+        """공유 엔진 인스턴스 (타입별 최초 1회만 생성)
+        
+        엔진은 설정/파서만 보유하고 요청별 상태가 없으므로 프로세스 내에서 재사용한다.
+        """
+        engine = cls._instances.get(engine_type)
+        if engine is None:
+            # 스레드(to_thread 등)에서 동시에 처음 호출돼도 인스턴스는 하나만
+            with cls._instances_lock:
+                engine = cls._instances.get(engine_type)
+                if engine is None:
+                    engine = cls._instances[engine_type] = cls.create(engine_type)
+        return engine
+    
     @classmethod
     def list_engines(cls):
         """사용 가능한 엔진 목록"""
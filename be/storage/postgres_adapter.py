@@ -20,6 +20,14 @@ import asyncpg
 
 logger = logging.getLogger(__name__)
 
+# 연결 계열 오류만 재시도 (서버 재시작 / 연결 끊김 / 커넥션 한도)
+_RETRYABLE_ERRORS = (
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.CannotConnectNowError,
+    asyncpg.exceptions.TooManyConnectionsError,
+    OSError,
+)
+
 # Status values matching ScanStatus enum in Spring Boot
 SCAN_STATUS_UPLOADED = "UPLOADED"
 SCAN_STATUS_EXTRACTING = "EXTRACTING"
@@ -40,11 +48,15 @@ class PostgresAdapter:
         self.pool = pool
     
     async def _retry(self, func, *args, max_retries: int = 3, **kwargs):
-        """Retry on connection errors with exponential backoff."""
+        """Retry on connection errors with exponential backoff.
+
+        Query errors (syntax, constraint, data) are raised immediately since
+        retrying cannot fix them; connections are not pinged up front.
+        """
         for attempt in range(max_retries):
             try:
                 return await func(*args, **kwargs)
-            except (asyncpg.exceptions.PostgresError, ConnectionRefusedError) as e:
+            except _RETRYABLE_ERRORS as e:
                 if attempt == max_retries - 1:
                     logger.error(f"Max retries reached. Last error: {e}")
                     raise
@@ -113,6 +125,42 @@ class PostgresAdapter:
         await self._retry(_update)
         logger.info(f"Updated session status: session_id={session_id}, status={status}")
     
+    async def update_status_many(
+        self,
+        session_ids: List[str],
+        status: str,
+        error_message: Optional[str] = None
+    ):
+        """
+        Update status of several scan_sessions in a single statement.
+        
+        Replaces N update_status() round-trips when a whole building job
+        changes state at once.
+        
+        Args:
+            session_ids: scan_sessions.id values (UUID strings)
+            status: One of UPLOADED, EXTRACTING, PROCESSING, COMPLETED, FAILED
+            error_message: Error details (for FAILED status)
+        """
+        if not session_ids:
+            return
+        
+        async def _update():
+            async with self.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    UPDATE scan_sessions
+                    SET status = $1, error_message = $2, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ANY($3::uuid[])
+                    """,
+                    status,
+                    error_message,
+                    [uuid.UUID(sid) for sid in session_ids]
+                )
+        
+        await self._retry(_update)
+        logger.info(f"Updated session status: sessions={len(session_ids)}, status={status}")
+    
     async def update_processing_result(
         self,
         session_id: str,
@@ -1,14 +1,96 @@
 # storage/storage_manager.py
 import os
 import json
-import base64
+import asyncio
+import logging
+import shutil
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 import aiofiles
+import numpy as np
+import orjson
 from datetime import datetime
 
 from config.settings import settings
 from slam_interface.base import SLAMEngineBase
+from utils.base64_codec import b64decode
+from storage.write_queue import BackgroundWriter
+from utils.trajectory import trajectory_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps_json(obj) -> str:
+    """세션 JSON 직렬화 (ensure_ascii=False: 비ASCII 문자를 이스케이프 없이 UTF-8로 기록)"""
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+# maps_dir 안의 map_id -> PLY 절대 경로 인덱스 (뷰어가 세션 디렉토리를 뒤지지 않도록)
+MAP_INDEX_NAME = "_index.json"
+_map_index_lock = threading.Lock()
+
+
+def _update_map_index(maps_dir: Path, map_id: str, ply_path: Path) -> None:
+    """인덱스에 map_id 항목을 추가/갱신 (임시 파일에 쓰고 rename 하므로 읽는 쪽은 항상 완전한 파일을 봄)"""
+    index_path = maps_dir / MAP_INDEX_NAME
+    with _map_index_lock:
+        try:
+            index = orjson.loads(index_path.read_bytes())
+        except FileNotFoundError:
+            index = {}
+        except orjson.JSONDecodeError:
+            logger.warning("[StorageManager] %s 손상, 새로 생성", index_path)
+            index = {}
+        index[map_id] = str(ply_path.resolve())
+
+        tmp_path = index_path.with_name(f".{MAP_INDEX_NAME}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(index, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        os.replace(tmp_path, index_path)
+
+
+# _meta.json 안의 뷰어 통계 키 (뷰어가 페이지마다 DB 를 파싱하지 않도록 저장 시 한 번 계산)
+VIEWER_STATS_KEY = "viewer_stats"
+
+
+def _viewer_stats(metadata: Dict, db_path: Path) -> Dict:
+    travelled, center_x, center_y, center_z, min_y, _, max_span = trajectory_stats(
+        metadata.get("keyframes", [])
+    )
+    stats = {
+        "keyframe_count": len(metadata.get("keyframes", [])),
+        "num_map_points": metadata.get("num_map_points", 0),
+        "loop_closures": metadata.get("loop_closures", 0),
+        "travelled": travelled,
+        "center": [center_x, center_y, center_z],
+        "min_y": min_y,
+        "max_span": max_span,
+    }
+    # 같은 경로에 DB 가 다시 쓰이면 무효가 되도록 저장 시점의 DB 버전을 함께 기록
+    try:
+        st = db_path.stat()
+    except FileNotFoundError:
+        return stats
+    stats.update(db_size=st.st_size, db_size_mb=st.st_size / (1024 * 1024), db_mtime_ns=st.st_mtime_ns)
+    return stats
+
+
+def _copy_to_path(src, dest_path: Path, buffer_size: int = 65536) -> None:
+    """file-like 객체 내용을 dest_path 로 스트리밍 복사"""
+    src.seek(0)
+    with open(dest_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, buffer_size)
+
+
+def _write_depth_png(depth_data: bytes, width: int, height: int, depth_path: Path) -> None:
+    """uint16 뎁스 버퍼를 16-bit PNG로 저장"""
+    import cv2
+    
+    depth_array = np.frombuffer(depth_data, dtype=np.uint16).reshape((height, width))
+    # imwrite 는 실패해도 예외 없이 False 만 반환하므로 OSError 로 올려 재시도/실패 집계되게 함
+    if not cv2.imwrite(str(depth_path), depth_array):
+        raise OSError(f"Failed to write depth PNG: {depth_path}")
+
 
 class StorageManager:
     """세션 및 맵 데이터 저장소 관리자"""
@@ -22,6 +104,20 @@ class StorageManager:
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
         self.maps_dir.mkdir(parents=True, exist_ok=True)
+        
+        # finish 대기 중인 세션: 프레임 저장 시 notify (폴링 대신)
+        self._frame_conditions: Dict[str, asyncio.Condition] = {}
+        self._frame_counts: Dict[str, int] = {}
+        self._frame_waiters: Dict[str, int] = {}
+        
+        # 상태 스트림(SSE) 구독 중인 세션만 유지: 최신 상태 / 버전 / 변경 알림 / 구독자 수
+        self._status_cache: Dict[str, Dict] = {}
+        self._status_versions: Dict[str, int] = {}
+        self._status_conditions: Dict[str, asyncio.Condition] = {}
+        self._status_watchers: Dict[str, int] = {}
+        
+        # 뎁스 PNG 인코딩/쓰기는 백그라운드 큐로 (요청 응답이 디스크 지연에 묶이지 않게)
+        self.writer = BackgroundWriter()
     
     async def create_session(self, session_id: str, device_info: Dict) -> Dict:
         """새 스캔 세션 생성"""
@@ -40,8 +136,10 @@ class StorageManager:
             "total_chunks": 0,
         }
         
-        async with aiofiles.open(session_path / "metadata.json", "w") as f:
-            await f.write(json.dumps(metadata, indent=2))
+        async with aiofiles.open(session_path / "metadata.json", "w", encoding="utf-8") as f:
+            await f.write(_dumps_json(metadata))
+        
+        await self._publish_status(session_id, metadata)
         
         return metadata
     
@@ -52,6 +150,29 @@ class StorageManager:
         frames: List[Dict]
     ) -> int:
         """청크 단위로 프레임 저장"""
+        return await self.save_chunk_columns(
+            session_id=session_id,
+            chunk_index=chunk_index,
+            images=[frame["image"] for frame in frames],
+            timestamps=[frame["timestamp"] for frame in frames],
+            positions=[frame["position"] for frame in frames],
+            orientations=[frame["orientation"] for frame in frames],
+            imu=[frame.get("imu") for frame in frames],
+            camera_intrinsics=[frame.get("camera_intrinsics") for frame in frames],
+        )
+    
+    async def save_chunk_columns(
+        self,
+        session_id: str,
+        chunk_index: int,
+        images: List[str],
+        timestamps: List[int],
+        positions: List[List[float]],
+        orientations: List[List[float]],
+        imu: Optional[List[Optional[Dict]]] = None,
+        camera_intrinsics: Optional[List[Optional[Dict]]] = None,
+    ) -> int:
+        """컬럼형(SoA) 청크 저장 - 프레임 i는 각 리스트의 i번째 원소"""
         session_path = self.sessions_dir / session_id
         
         if not session_path.exists():
@@ -60,11 +181,16 @@ class StorageManager:
         images_dir = session_path / "images"
         poses = []
         
-        for i, frame in enumerate(frames):
+        num_frames = len(images)
+        imu = imu or [None] * num_frames
+        camera_intrinsics = camera_intrinsics or [None] * num_frames
+        
+        columns = zip(images, timestamps, positions, orientations, imu, camera_intrinsics)
+        for i, (image_b64, timestamp, position, orientation, frame_imu, intrinsics) in enumerate(columns):
             frame_idx = chunk_index * 1000 + i
             
             try:
-                image_data = base64.b64decode(frame["image"])
+                image_data = b64decode(image_b64)
                 
                 image_path = images_dir / f"{frame_idx:06d}.jpg"
                 async with aiofiles.open(image_path, "wb") as f:
@@ -72,12 +198,12 @@ class StorageManager:
                 
                 poses.append({
                     "frame_index": frame_idx,
-                    "timestamp": frame["timestamp"],
-                    "position": frame["position"],
-                    "orientation": frame["orientation"],
+                    "timestamp": timestamp,
+                    "position": position,
+                    "orientation": orientation,
                     "image_path": str(image_path.relative_to(session_path)),
-                    "imu": frame.get("imu"),
-                    "camera_intrinsics": frame.get("camera_intrinsics"),
+                    "imu": frame_imu,
+                    "camera_intrinsics": intrinsics,
                 })
                 
             except Exception as e:
@@ -85,8 +211,8 @@ class StorageManager:
                 continue
         
         chunk_file = session_path / "chunks" / f"chunk_{chunk_index:04d}.json"
-        async with aiofiles.open(chunk_file, "w") as f:
-            await f.write(json.dumps(poses, indent=2))
+        async with aiofiles.open(chunk_file, "w", encoding="utf-8") as f:
+            await f.write(_dumps_json(poses))
         
         await self._update_metadata(session_id, len(poses), chunk_index)
         
@@ -111,13 +237,17 @@ class StorageManager:
         
         frame_idx = chunk_index * 1000 + frame_index
         
-        image_data = frame_data.get("image_data")
-        if not image_data:
-            raise ValueError("image_data is required")
-        
         image_path = images_dir / f"{frame_idx:06d}.jpg"
-        async with aiofiles.open(image_path, "wb") as f:
-            await f.write(image_data)
+        image_file = frame_data.get("image_file")
+        image_data = frame_data.get("image_data")
+        if image_file is not None:
+            # 업로드 스풀 파일을 그대로 디스크로 복사 (bytes 객체로 메모리에 올리지 않음)
+            await asyncio.to_thread(_copy_to_path, image_file, image_path)
+        elif image_data:
+            async with aiofiles.open(image_path, "wb") as f:
+                await f.write(image_data)
+        else:
+            raise ValueError("image_data or image_file is required")
         
         depth_path = None
         depth_data = frame_data.get("depth_data")
@@ -125,13 +255,8 @@ class StorageManager:
         depth_height = frame_data.get("depth_height")
         
         if depth_data and depth_width and depth_height:
-            import numpy as np
-            import cv2
-            
-            depth_array = np.frombuffer(depth_data, dtype=np.uint16).reshape((depth_height, depth_width))
             depth_path = depth_dir / f"{frame_idx:06d}.png"
-            
-            cv2.imwrite(str(depth_path), depth_array)
+            _write_depth_png(depth_data, depth_width, depth_height, depth_path)
         
         pose_entry = {
             "frame_index": frame_idx,
@@ -147,18 +272,128 @@ class StorageManager:
         chunk_file = session_path / "chunks" / f"chunk_{chunk_index:04d}.json"
         
         if chunk_file.exists():
-            async with aiofiles.open(chunk_file, "r") as f:
+            async with aiofiles.open(chunk_file, "r", encoding="utf-8") as f:
                 poses = json.loads(await f.read())
         else:
             poses = []
         
         poses.append(pose_entry)
         
-        async with aiofiles.open(chunk_file, "w") as f:
-            await f.write(json.dumps(poses, indent=2))
+        async with aiofiles.open(chunk_file, "w", encoding="utf-8") as f:
+            await f.write(_dumps_json(poses))
         
         await self._update_metadata(session_id, 1, chunk_index)
     
+    async def write_frame_image(
+        self,
+        session_id: str,
+        chunk_index: int,
+        frame_index: int,
+        pieces: AsyncIterator[bytes],
+    ) -> Path:
+        """스트림으로 도착하는 JPEG 조각을 바로 디스크에 기록 (전체를 메모리에 모으지 않음)"""
+        frame_idx = chunk_index * 1000 + frame_index
+        image_path = self.sessions_dir / session_id / "images" / f"{frame_idx:06d}.jpg"
+        try:
+            async with aiofiles.open(image_path, "wb") as f:
+                async for piece in pieces:
+                    await f.write(piece)
+        except BaseException:
+            # 스트림이 중간에 끊기면 잘린 JPEG 가 images/ 에 남아 DB 빌드에 들어가지 않도록 삭제
+            image_path.unlink(missing_ok=True)
+            raise
+        return image_path
+    
+    async def save_chunk_binary(
+        self,
+        session_id: str,
+        chunk_index: int,
+        image_files: Optional[List],
+        timestamps: List[int],
+        positions,
+        orientations,
+        imu: List[Optional[Dict]],
+        camera_intrinsics: Optional[Dict],
+        depths: List[Optional[bytes]],
+        depth_widths: List[Optional[int]],
+        depth_heights: List[Optional[int]],
+    ) -> int:
+        """바이너리 청크 일괄 저장
+        
+        이미지/뎁스 파일은 동시에 쓰고, 청크 JSON과 세션 메타데이터는
+        청크당 한 번만 갱신한다 (프레임마다 재작성하지 않음).
+        
+        Args:
+            image_files: 프레임별 JPEG file-like 객체 (업로드 스풀 파일).
+                None 이면 write_frame_image 로 이미 기록된 것으로 간주
+            timestamps: 프레임별 타임스탬프 (길이 = 프레임 수)
+            positions: (N, 3) 배열, orientations: (N, 4) 배열
+            depths: 프레임별 uint16 뎁스 버퍼 (없으면 None)
+        """
+        session_path = self.sessions_dir / session_id
+        
+        if not session_path.exists():
+            raise ValueError(f"Session {session_id} not found")
+        
+        images_dir = session_path / "images"
+        depth_dir = session_path / "depth"
+        depth_dir.mkdir(exist_ok=True)
+        
+        frame_indices = [chunk_index * 1000 + i for i in range(len(timestamps))]
+        image_paths = [images_dir / f"{frame_idx:06d}.jpg" for frame_idx in frame_indices]
+        depth_paths = [
+            depth_dir / f"{frame_idx:06d}.png" if depth_data and width and height else None
+            for frame_idx, depth_data, width, height in zip(frame_indices, depths, depth_widths, depth_heights)
+        ]
+        
+        # 업로드 스풀 파일은 요청 종료 시 닫히므로 이미지 복사는 응답 전에 완료
+        if image_files is not None:
+            await asyncio.gather(*(
+                asyncio.to_thread(_copy_to_path, image_file, image_path)
+                for image_file, image_path in zip(image_files, image_paths)
+            ))
+        # 뎁스는 메모리에 있는 버퍼이므로 백그라운드 큐에 넘기고 바로 반환 (finish 에서 drain)
+        for depth_data, width, height, depth_path in zip(depths, depth_widths, depth_heights, depth_paths):
+            if depth_path is not None:
+                await self.writer.submit(session_id, _write_depth_png, depth_data, width, height, depth_path)
+        
+        columns = zip(frame_indices, timestamps, np.asarray(positions).tolist(), np.asarray(orientations).tolist(),
+                      image_paths, depth_paths, imu)
+        new_poses = [
+            {
+                "frame_index": frame_idx,
+                "timestamp": timestamp,
+                "position": position,
+                "orientation": orientation,
+                "image_path": str(image_path.relative_to(session_path)),
+                "depth_path": str(depth_path.relative_to(session_path)) if depth_path else None,
+                "imu": frame_imu,
+                "camera_intrinsics": camera_intrinsics,
+            }
+            for frame_idx, timestamp, position, orientation, image_path, depth_path, frame_imu in columns
+        ]
+        
+        chunk_file = session_path / "chunks" / f"chunk_{chunk_index:04d}.json"
+        
+        if chunk_file.exists():
+            async with aiofiles.open(chunk_file, "r", encoding="utf-8") as f:
+                poses = json.loads(await f.read())
+        else:
+            poses = []
+        
+        poses.extend(new_poses)
+        
+        async with aiofiles.open(chunk_file, "w", encoding="utf-8") as f:
+            await f.write(_dumps_json(poses))
+        
+        await self._update_metadata(session_id, len(new_poses), chunk_index)
+        
+        return len(new_poses)
+    
+    async def wait_for_writes(self, session_id: str) -> int:
+        """세션의 백그라운드 파일 쓰기 완료 대기 (실패 건수 반환)"""
+        return await self.writer.drain(session_id)
+    
     async def _update_metadata(
         self, 
         session_id: str, 
@@ -168,15 +403,57 @@ class StorageManager:
         """메타데이터 업데이트"""
         metadata_path = self.sessions_dir / session_id / "metadata.json"
         
-        async with aiofiles.open(metadata_path, "r") as f:
+        async with aiofiles.open(metadata_path, "r", encoding="utf-8") as f:
             metadata = json.loads(await f.read())
         
         metadata["total_frames"] += new_frames
         metadata["total_chunks"] = max(metadata["total_chunks"], chunk_index + 1)
         metadata["last_updated"] = datetime.now().isoformat()
         
-        async with aiofiles.open(metadata_path, "w") as f:
-            await f.write(json.dumps(metadata, indent=2))
+        async with aiofiles.open(metadata_path, "w", encoding="utf-8") as f:
+            await f.write(_dumps_json(metadata))
+        
+        await self._publish_status(session_id, metadata)
+        
+        condition = self._frame_conditions.get(session_id)
+        if condition is not None:
+            self._frame_counts[session_id] = metadata["total_frames"]
+            async with condition:
+                condition.notify_all()
+    
+    async def wait_for_frames(self, session_id: str, expected_frames: int, timeout: float) -> int:
+        """저장된 프레임 수가 expected_frames 에 도달할 때까지 대기
+        
+        Returns:
+            대기 종료 시점의 프레임 수
+        
+        Raises:
+            TimeoutError: timeout 안에 도달하지 못한 경우
+        """
+        condition = self._frame_conditions.setdefault(session_id, asyncio.Condition())
+        self._frame_counts.setdefault(session_id, 0)
+        self._frame_waiters[session_id] = self._frame_waiters.get(session_id, 0) + 1
+        try:
+            # 대기 등록 이전에 이미 저장된 프레임 반영
+            status = await self.get_session_status(session_id)
+            self._frame_counts[session_id] = max(
+                self._frame_counts[session_id], status.get("total_frames", 0)
+            )
+            async with condition:
+                await asyncio.wait_for(
+                    condition.wait_for(lambda: self._frame_counts[session_id] >= expected_frames),
+                    timeout=timeout,
+                )
+            return self._frame_counts[session_id]
+        finally:
+            # 같은 세션에 동시/재시도 finish 가 대기 중이면 조건을 남겨둠
+            remaining = self._frame_waiters[session_id] - 1
+            if remaining:
+                self._frame_waiters[session_id] = remaining
+            else:
+                self._frame_waiters.pop(session_id, None)
+                self._frame_conditions.pop(session_id, None)
+                self._frame_counts.pop(session_id, None)
     
     async def session_exists(self, session_id: str) -> bool:
         """세션 존재 여부"""
@@ -189,11 +466,48 @@ class StorageManager:
         if not metadata_path.exists():
             raise ValueError(f"Session {session_id} not found")
         
-        async with aiofiles.open(metadata_path, "r") as f:
+        async with aiofiles.open(metadata_path, "r", encoding="utf-8") as f:
             metadata = json.loads(await f.read())
         
         return metadata
     
+    async def watch_status(self, session_id: str) -> AsyncIterator[Dict]:
+        """현재 상태를 먼저 내보내고, 이후 상태가 바뀔 때마다 내보냄 (completed/failed 에서 종료)"""
+        condition = self._status_conditions.setdefault(session_id, asyncio.Condition())
+        self._status_watchers[session_id] = self._status_watchers.get(session_id, 0) + 1
+        try:
+            version = self._status_versions.get(session_id, 0)
+            status = await self.get_session_status(session_id)
+            while True:
+                yield status
+                if status.get("status") in ("completed", "failed"):
+                    return
+                async with condition:
+                    await condition.wait_for(lambda: self._status_versions.get(session_id, 0) != version)
+                version = self._status_versions[session_id]
+                status = dict(self._status_cache[session_id])
+        finally:
+            # 마지막 구독자가 빠지면 세션 상태 정리 (캐시가 세션 수만큼 계속 커지지 않게)
+            remaining = self._status_watchers[session_id] - 1
+            if remaining:
+                self._status_watchers[session_id] = remaining
+            else:
+                self._status_watchers.pop(session_id, None)
+                self._status_conditions.pop(session_id, None)
+                self._status_versions.pop(session_id, None)
+                self._status_cache.pop(session_id, None)
+    
+    async def _publish_status(self, session_id: str, metadata: Dict):
+        """기록된 메타데이터를 상태 구독자에게 알림 (구독자가 없으면 무시)"""
+        if session_id not in self._status_watchers:
+            return
+        self._status_cache[session_id] = metadata
+        self._status_versions[session_id] = self._status_versions.get(session_id, 0) + 1
+        condition = self._status_conditions.get(session_id)
+        if condition is not None:
+            async with condition:
+                condition.notify_all()
+    
     async def update_status(
         self, 
         session_id: str, 
@@ -203,15 +517,17 @@ class StorageManager:
         """세션 상태 업데이트"""
         metadata_path = self.sessions_dir / session_id / "metadata.json"
         
-        async with aiofiles.open(metadata_path, "r") as f:
+        async with aiofiles.open(metadata_path, "r", encoding="utf-8") as f:
             metadata = json.loads(await f.read())
         
         metadata["status"] = status
         metadata["updated_at"] = datetime.now().isoformat()
         metadata.update(kwargs)
         
-        async with aiofiles.open(metadata_path, "w") as f:
-            await f.write(json.dumps(metadata, indent=2))
+        async with aiofiles.open(metadata_path, "w", encoding="utf-8") as f:
+            await f.write(_dumps_json(metadata))
+        
+        await self._publish_status(session_id, metadata)
     
     async def update_progress(self, session_id: str, progress: float):
         """처리 진행률 업데이트"""
@@ -227,8 +543,12 @@ class StorageManager:
         chunks_dir = session_path / "chunks"
         all_poses = []
         
-        for chunk_file in sorted(chunks_dir.glob("chunk_*.json")):
-            async with aiofiles.open(chunk_file, "r") as f:
+        chunk_files = sorted(
+            entry.path for entry in os.scandir(chunks_dir)
+            if entry.name.startswith("chunk_") and entry.name.endswith(".json")
+        )
+        for chunk_file in chunk_files:
+            async with aiofiles.open(chunk_file, "r", encoding="utf-8") as f:
                 chunk_data = json.loads(await f.read())
                 all_poses.extend(chunk_data)
         
@@ -246,9 +566,30 @@ class StorageManager:
         if "binary" in map_data:
             engine.save_map(map_data, map_id, self.maps_dir)
         
+        metadata = {
+            **map_data["metadata"],
+            VIEWER_STATS_KEY: await asyncio.to_thread(
+                _viewer_stats, map_data["metadata"], self.maps_dir / f"{map_id}.db"
+            ),
+        }
+        
+        # keyframes 수천 개 직렬화는 stdlib json보다 orjson이 훨씬 빠름
         meta_path = self.maps_dir / f"{map_id}_meta.json"
-        async with aiofiles.open(meta_path, "w") as f:
-            await f.write(json.dumps(map_data["metadata"], indent=2))
+        async with aiofiles.open(meta_path, "wb") as f:
+            await f.write(orjson.dumps(
+                metadata,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE,
+            ))
+        
+        # 뷰어용 PLY 위치 기록 (maps_dir 로 복사된 사본 우선, 없으면 세션 출력)
+        session_path = map_data["metadata"].get("session_path")
+        for ply_path in (
+            self.maps_dir / f"{map_id}.ply",
+            Path(session_path) / "rtabmap_cloud.ply" if session_path else None,
+        ):
+            if ply_path is not None and ply_path.exists():
+                await asyncio.to_thread(_update_map_index, self.maps_dir, map_id, ply_path)
+                break
         
         return map_id
     
@@ -259,8 +600,8 @@ class StorageManager:
         if not meta_path.exists():
             raise ValueError(f"Map {map_id} not found")
         
-        async with aiofiles.open(meta_path, "r") as f:
-            metadata = json.loads(await f.read())
+        async with aiofiles.open(meta_path, "rb") as f:
+            metadata = orjson.loads(await f.read())
         
         binary_data = engine.load_map(map_id, self.maps_dir)
         
@@ -0,0 +1,86 @@
+# storage/write_queue.py
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """Bounded producer/consumer queue for blocking file writes.
+
+    Upload handlers enqueue write callables and return without waiting on
+    disk; W workers run them in threads, retrying OSError with exponential
+    backoff. Futures are tracked per session so /finish can drain them.
+    Workers start lazily on first submit (needs a running event loop).
+    """
+
+    def __init__(self, num_workers: int = 4, maxsize: int = 128, max_retries: int = 3):
+        self.num_workers = num_workers
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker_tasks = []
+        self._pending: Dict[str, Set[asyncio.Future]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self.queue is None or self._loop is not loop:
+            # 이벤트 루프가 바뀌면 (테스트 클라이언트 등) 큐/워커를 새로 구성
+            self._loop = loop
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+            self.worker_tasks = []
+        self.worker_tasks = [task for task in self.worker_tasks if not task.done()]
+        while len(self.worker_tasks) < self.num_workers:
+            self.worker_tasks.append(asyncio.create_task(self._worker_loop()))
+
+    async def submit(self, session_id: str, func: Callable, *args) -> asyncio.Future:
+        """Queue func(*args); blocks only while the queue is full (backpressure)."""
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(session_id, set())
+        pending.add(future)
+        # 성공한 쓰기는 바로 추적 해제 (실패만 drain 때 집계)
+        future.add_done_callback(lambda f: not f.cancelled() and f.exception() is None and pending.discard(f))
+        await self.queue.put((future, func, args))
+        return future
+
+    async def drain(self, session_id: str) -> int:
+        """Wait for every queued write of session_id; returns the number that failed."""
+        futures = self._pending.pop(session_id, set())
+        if not futures:
+            return 0
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return sum(1 for r in results if isinstance(r, BaseException))
+
+    async def _worker_loop(self):
+        while True:
+            future, func, args = await self.queue.get()
+            try:
+                # 취소된 요청은 건너뜀 (완료된 future 에 결과를 넣으면 워커가 죽음)
+                if future.cancelled():
+                    continue
+                for attempt in range(self.max_retries):
+                    try:
+                        await asyncio.to_thread(func, *args)
+                    except OSError as e:
+                        if attempt == self.max_retries - 1:
+                            logger.error("Background write failed after %s attempts: %s", self.max_retries, e)
+                            if not future.done():
+                                future.set_exception(e)
+                            break
+                        delay = 0.1 * (2 ** attempt)
+                        logger.warning("Background write attempt %s failed: %s. Retrying in %ss...", attempt + 1, e, delay)
+                        await asyncio.sleep(delay)
+                    except Exception as e:
+                        logger.error("Background write failed: %s", e)
+                        if not future.done():
+                            future.set_exception(e)
+                        break
+                    else:
+                        if not future.done():
+                            future.set_result(True)
+                        break
+            finally:
+                self.queue.task_done()
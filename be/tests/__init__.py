@@ -0,0 +1,7 @@
+# tests/__init__.py
+# 실행: be/ 에서 python -m unittest discover -s tests -t .
+# config.settings 는 import 시 DATA_DIR 을 읽으므로 앱 모듈보다 먼저 임시 디렉토리로 지정
+import os
+import tempfile
+
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="be-tests-"))
@@ -0,0 +1,48 @@
+# tests/helpers.py
+import sqlite3
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+
+def random_rotations(rng: np.random.Generator, n: int) -> np.ndarray:
+    """균일한 랜덤 회전 행렬 (n, 3, 3)"""
+    q = rng.normal(size=(n, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    x, y, z, w = q.T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=-1),
+        np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=-1),
+        np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=1)
+
+
+def make_map_db(path: Path, poses: List[np.ndarray], num_features: int = 100, seed: int = 0) -> None:
+    """Node/Link/Feature 만 있는 최소 RTAB-Map DB 생성 (poses: 3x4 행렬 목록)"""
+    rng = np.random.default_rng(seed)
+    path.unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE Node (id INTEGER NOT NULL, map_id INTEGER NOT NULL, weight INTEGER,
+                           stamp FLOAT, pose BLOB, PRIMARY KEY(id));
+        CREATE TABLE Link (from_id INTEGER, to_id INTEGER, type INTEGER);
+        CREATE TABLE Feature (node_id INTEGER, word_id INTEGER,
+                              depth_x FLOAT, depth_y FLOAT, depth_z FLOAT);
+        """
+    )
+    conn.executemany(
+        "INSERT INTO Node VALUES (?, 0, 0, ?, ?)",
+        [(i + 1, i * 0.1, np.asarray(pose, dtype="<f4").tobytes()) for i, pose in enumerate(poses)],
+    )
+    conn.executemany(
+        "INSERT INTO Link VALUES (?, ?, ?)",
+        [(i, i + 1, 2 if i % 3 == 0 else 0) for i in range(1, len(poses))],
+    )
+    conn.executemany(
+        "INSERT INTO Feature VALUES (?, 0, ?, ?, ?)",
+        [(int(rng.integers(1, len(poses) + 1)), *map(float, rng.normal(size=3))) for _ in range(num_features)],
+    )
+    conn.commit()
+    conn.close()
@@ -0,0 +1,99 @@
+# tests/test_database_parser.py
+import math
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from slam_engines.rtabmap.database_parser import DatabaseParser, _rotations_to_quaternions
+from tests.helpers import make_map_db, random_rotations
+
+
+def _parse_pose_blob(blob: bytes):
+    """이전 DatabaseParser._parse_pose_blob (행 단위 스칼라 변환) - 기준 구현"""
+    if len(blob) < 48:
+        return None
+
+    values = struct.unpack('12f', blob[:48])
+
+    r11, r12, r13 = values[0], values[1], values[2]
+    r21, r22, r23 = values[4], values[5], values[6]
+    r31, r32, r33 = values[8], values[9], values[10]
+    tx, ty, tz = values[3], values[7], values[11]
+
+    trace = r11 + r22 + r33
+    if trace > 0:
+        s = 0.5 / math.sqrt(trace + 1.0)
+        qw = 0.25 / s
+        qx = (r32 - r23) * s
+        qy = (r13 - r31) * s
+        qz = (r21 - r12) * s
+    elif r11 > r22 and r11 > r33:
+        s = 2.0 * math.sqrt(1.0 + r11 - r22 - r33)
+        qw = (r32 - r23) / s
+        qx = 0.25 * s
+        qy = (r12 + r21) / s
+        qz = (r13 + r31) / s
+    elif r22 > r33:
+        s = 2.0 * math.sqrt(1.0 + r22 - r11 - r33)
+        qw = (r13 - r31) / s
+        qx = (r12 + r21) / s
+        qy = 0.25 * s
+        qz = (r23 + r32) / s
+    else:
+        s = 2.0 * math.sqrt(1.0 + r33 - r11 - r22)
+        qw = (r21 - r12) / s
+        qx = (r13 + r31) / s
+        qy = (r23 + r32) / s
+        qz = 0.25 * s
+
+    return {
+        'position': [tx, ty, tz],
+        'orientation': [qx, qy, qz, qw]
+    }
+
+
+def _test_poses(n: int = 200, seed: int = 0) -> np.ndarray:
+    """랜덤 회전 + 각 분기를 타는 회전 (trace > 0, r11/r22/r33 최대) 의 (N, 3, 4) float32 포즈"""
+    rng = np.random.default_rng(seed)
+    rotations = [
+        np.eye(3),
+        np.diag([1.0, -1.0, -1.0]),   # x 축 180도: r11 최대
+        np.diag([-1.0, 1.0, -1.0]),   # y 축 180도: r22 최대
+        np.diag([-1.0, -1.0, 1.0]),   # z 축 180도: r33 최대
+        *random_rotations(rng, n),
+    ]
+    translations = rng.normal(size=(len(rotations), 3, 1)) * 10
+    return np.concatenate([np.asarray(rotations), translations], axis=2).astype('<f4')
+
+
+class QuaternionEquivalenceTest(unittest.TestCase):
+    def test_vectorized_matches_scalar_pose_blob(self):
+        poses = _test_poses()
+        expected = np.array([_parse_pose_blob(pose.tobytes())['orientation'] for pose in poses])
+
+        actual = _rotations_to_quaternions(poses[:, :, :3].astype(np.float64))
+
+        self.assertEqual(actual.shape, expected.shape)
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+    def test_parse_database_matches_scalar_pose_blob(self):
+        poses = _test_poses(n=50, seed=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "map.db"
+            make_map_db(db_path, list(poses))
+
+            parsed = DatabaseParser().parse_database_sync(str(db_path), use_cache=False)
+
+        self.assertEqual(parsed['num_keyframes'], len(poses))
+        self.assertEqual([kf['id'] for kf in parsed['keyframes']], list(range(1, len(poses) + 1)))
+        for keyframe, pose in zip(parsed['keyframes'], poses):
+            expected = _parse_pose_blob(pose.tobytes())
+            np.testing.assert_allclose(keyframe['position'], expected['position'], rtol=0, atol=1e-12)
+            np.testing.assert_allclose(keyframe['orientation'], expected['orientation'], rtol=0, atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+# tests/test_db_builder.py
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from slam_engines.rtabmap import db_builder
+from slam_engines.rtabmap.db_builder import build_calibration_blob, build_database, build_identity_pose
+
+INTRINSICS = {'fx': 50.0, 'fy': 50.0, 'cx': 32.0, 'cy': 24.0, 'width': 64, 'height': 48}
+W, H = INTRINSICS['width'], INTRINSICS['height']
+
+
+def _make_session(root: Path) -> dict:
+    """청크 2개짜리 세션 (000000~000002, 001000~001002) 생성.
+
+    - 000001: 뎁스 없음 -> 건너뜀
+    - 001000: 절반 해상도 뎁스 -> 리사이즈
+    - 001002: 값이 전부 0 인 뎁스 -> 건너뜀
+    """
+    rng = np.random.default_rng(0)
+    for name in ("images", "depth", "chunks"):
+        (root / name).mkdir(parents=True)
+
+    depths = {}
+    for chunk_index in range(2):
+        frames = []
+        for i in range(3):
+            frame_idx = chunk_index * 1000 + i
+            stem = f"{frame_idx:06d}"
+            image = (rng.random((H, W, 3)) * 255).astype(np.uint8)
+            cv2.imwrite(str(root / "images" / f"{stem}.jpg"), image)
+
+            if frame_idx == 1:
+                depth = None
+            elif frame_idx == 1000:
+                depth = (rng.random((H // 2, W // 2)) * 3000 + 1).astype(np.uint16)
+            elif frame_idx == 1002:
+                depth = np.zeros((H, W), np.uint16)
+            else:
+                depth = (rng.random((H, W)) * 3000 + 1).astype(np.uint16)
+            if depth is not None:
+                cv2.imwrite(str(root / "depth" / f"{stem}.png"), depth)
+                depths[stem] = depth
+
+            frames.append({
+                "frame_index": frame_idx,
+                "timestamp": 1_700_000_000_000 + frame_idx * 33,
+                "image_path": f"images/{stem}.jpg",
+                "depth_path": f"depth/{stem}.png" if depth is not None else None,
+            })
+        (root / "chunks" / f"chunk_{chunk_index:04d}.json").write_text(json.dumps(frames))
+    return depths
+
+
+def _rows(db_path: str) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT n.id, n.map_id, n.stamp, n.pose, d.image, d.depth, d.calibration "
+            "FROM Node n JOIN Data d ON d.id = n.id ORDER BY n.id"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+class BuildDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.session = Path(self._tmp.name) / "session"
+        self.depths = _make_session(self.session)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_multi_chunk_session(self):
+        out = build_database(str(self.session), INTRINSICS, slam_params={"Rtabmap/DetectionRate": "2"})
+        self.assertEqual(out, str(self.session / "rtabmap_input.db"))
+
+        rows = _rows(out)
+        stems = ["000000", "000002", "001000", "001001"]
+        self.assertEqual([row[0] for row in rows], [1, 2, 3, 4])
+
+        calib = build_calibration_blob(50.0, 50.0, 32.0, 24.0, W, H)
+        for row, stem in zip(rows, stems):
+            node_id, map_id, stamp, pose, image, depth, calibration = row
+            self.assertEqual(map_id, 0)
+            self.assertAlmostEqual(stamp, (1_700_000_000_000 + int(stem) * 33) / 1000.0)
+            self.assertEqual(pose, build_identity_pose())
+            self.assertEqual(image, (self.session / "images" / f"{stem}.jpg").read_bytes())
+            self.assertEqual(calibration, calib)
+
+            decoded = cv2.imdecode(np.frombuffer(depth, np.uint8), cv2.IMREAD_UNCHANGED)
+            self.assertEqual(decoded.dtype, np.uint16)
+            self.assertEqual(decoded.shape, (H, W))
+            expected = self.depths[stem]
+            if expected.shape != (H, W):
+                expected = cv2.resize(expected, (W, H), interpolation=cv2.INTER_NEAREST)
+            np.testing.assert_array_equal(decoded, expected)
+
+        # 목표 해상도 뎁스는 재인코딩 없이 원본 PNG 그대로
+        self.assertEqual(rows[0][5], (self.session / "depth" / "000000.png").read_bytes())
+
+        conn = sqlite3.connect(out)
+        try:
+            info = conn.execute("SELECT last_sign_added, parameters FROM Info").fetchone()
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM Admin").fetchone()[0], 1)
+        finally:
+            conn.close()
+        self.assertEqual(info, (4, "Rtabmap/DetectionRate:2;"))
+
+    def test_rebuild_replaces_existing_output(self):
+        out = str(self.session / "custom.db")
+        build_database(str(self.session), INTRINSICS, output_db=out)
+        build_database(str(self.session), INTRINSICS, output_db=out)
+        self.assertEqual(len(_rows(out)), 4)
+
+    def test_monocular_keeps_every_frame_without_depth(self):
+        out = build_database(str(self.session), INTRINSICS, monocular=True)
+        rows = _rows(out)
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(all(row[5] is None for row in rows))
+
+    def test_process_pool_matches_serial_build(self):
+        serial = _rows(build_database(str(self.session), INTRINSICS, output_db=str(self.session / "serial.db")))
+
+        # 프로세스 풀 경로 강제 (spawn 워커에서 load_and_resize_depth 실행)
+        with mock.patch.object(db_builder, "_DEPTH_POOL_MIN_FRAMES", 1), \
+                mock.patch.object(db_builder.os, "cpu_count", return_value=2):
+            pooled = _rows(build_database(str(self.session), INTRINSICS, output_db=str(self.session / "pooled.db")))
+
+        self.assertEqual(pooled, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_storage_manager.py
+import asyncio
+import unittest
+import uuid
+
+import numpy as np
+
+from storage.storage_manager import StorageManager
+
+
+class StorageManagerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.storage = StorageManager()
+        self.session_id = f"test_{uuid.uuid4().hex[:8]}"
+        await self.storage.create_session(self.session_id, {"model": "test"})
+
+    async def test_watch_status_streams_updates_and_evicts(self):
+        seen = []
+
+        async def watch():
+            async for status in self.storage.watch_status(self.session_id):
+                seen.append((status["status"], status.get("progress")))
+
+        watcher = asyncio.create_task(watch())
+        await asyncio.sleep(0)
+        await self.storage.update_progress(self.session_id, 40)
+        await asyncio.sleep(0)
+        await self.storage.update_status(self.session_id, "completed", map_id="m")
+        await asyncio.wait_for(watcher, timeout=5)
+
+        self.assertEqual(seen[0][0], "scanning")
+        self.assertEqual(seen[-1], ("completed", 40))
+        # 구독자가 없으면 상태 캐시/알림 항목이 남지 않음
+        for table in (self.storage._status_cache, self.storage._status_versions,
+                      self.storage._status_conditions, self.storage._status_watchers):
+            self.assertNotIn(self.session_id, table)
+
+        # /status 는 디스크의 최신 메타데이터를 읽음
+        await self.storage.update_status(self.session_id, "failed", error="x")
+        self.assertEqual((await self.storage.get_session_status(self.session_id))["status"], "failed")
+        self.assertNotIn(self.session_id, self.storage._status_cache)
+
+    async def test_concurrent_frame_waiters_keep_their_condition(self):
+        long_wait = asyncio.create_task(self.storage.wait_for_frames(self.session_id, 2, timeout=5))
+        short_wait = asyncio.create_task(self.storage.wait_for_frames(self.session_id, 1, timeout=0.05))
+        with self.assertRaises(TimeoutError):
+            await short_wait
+
+        await self.storage._update_metadata(self.session_id, 2, 0)
+        self.assertEqual(await asyncio.wait_for(long_wait, timeout=1), 2)
+        self.assertNotIn(self.session_id, self.storage._frame_conditions)
+        self.assertNotIn(self.session_id, self.storage._frame_waiters)
+
+    async def test_failed_depth_write_is_reported(self):
+        depth = np.arange(12, dtype="<u2").tobytes()
+        # 뎁스 PNG 경로를 디렉토리로 막아 쓰기 실패 유도
+        (self.storage.sessions_dir / self.session_id / "depth" / "000000.png").mkdir(parents=True)
+
+        with self.assertLogs("storage.write_queue", level="ERROR"):
+            await self.storage.save_chunk_binary(
+                session_id=self.session_id,
+                chunk_index=0,
+                image_files=None,
+                timestamps=[1, 2],
+                positions=[[0, 0, 0], [1, 1, 1]],
+                orientations=[[0, 0, 0, 1], [0, 0, 0, 1]],
+                imu=[None, None],
+                camera_intrinsics=None,
+                depths=[depth, depth],
+                depth_widths=[4, 4],
+                depth_heights=[3, 3],
+            )
+            self.assertEqual(await self.storage.wait_for_writes(self.session_id), 1)
+        self.assertTrue((self.storage.sessions_dir / self.session_id / "depth" / "000001.png").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_viewer_etag.py
+import os
+import unittest
+
+import numpy as np
+from starlette.requests import Request
+
+from config.settings import settings
+from routes import viewer
+from tests.helpers import make_map_db, random_rotations
+
+
+def _request(if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers})
+
+
+def _poses(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return list(np.concatenate([random_rotations(rng, n), rng.normal(size=(n, 3, 1))], axis=2))
+
+
+class ViewMapETagTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        settings.MAPS_DIR.mkdir(parents=True, exist_ok=True)
+        self.map_id = f"etag_test_{self.id().rsplit('.', 1)[-1]}"
+        self.db_path = settings.MAPS_DIR / f"{self.map_id}.db"
+        make_map_db(self.db_path, _poses(10))
+
+    def tearDown(self):
+        self.db_path.unlink(missing_ok=True)
+
+    async def test_matching_if_none_match_returns_304(self):
+        first = await viewer.view_map(self.map_id, _request(), pose=None)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["etag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn(b'<span class="value">10</span>', first.body)
+
+        second = await viewer.view_map(self.map_id, _request(etag), pose=None)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.body, b"")
+        self.assertEqual(second.headers["etag"], etag)
+        self.assertEqual(second.headers["cache-control"], first.headers["cache-control"])
+
+        # 강한/목록 형태의 If-None-Match 도 약한 비교로 일치
+        listed = await viewer.view_map(self.map_id, _request(f'"other", {etag.removeprefix("W/")}'), pose=None)
+        self.assertEqual(listed.status_code, 304)
+
+    async def test_stale_etag_returns_full_page(self):
+        response = await viewer.view_map(self.map_id, _request('W/"stale"'), pose=None)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], 'W/"stale"')
+
+    async def test_pose_changes_etag(self):
+        plain = await viewer.view_map(self.map_id, _request(), pose=None)
+        with_pose = await viewer.view_map(self.map_id, _request(plain.headers["etag"]), pose="1,2,3")
+        self.assertEqual(with_pose.status_code, 200)
+        self.assertNotEqual(with_pose.headers["etag"], plain.headers["etag"])
+        self.assertIn(b'"x":1.0', with_pose.body)
+
+    async def test_rebuilt_map_invalidates_etag(self):
+        first = await viewer.view_map(self.map_id, _request(), pose=None)
+        etag = first.headers["etag"]
+
+        # 같은 경로에 다시 빌드된 맵 (크기/mtime 변경)
+        make_map_db(self.db_path, _poses(20, seed=1))
+        st = self.db_path.stat()
+        os.utime(self.db_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        rebuilt = await viewer.view_map(self.map_id, _request(etag), pose=None)
+        self.assertEqual(rebuilt.status_code, 200)
+        self.assertNotEqual(rebuilt.headers["etag"], etag)
+        self.assertIn(b'<span class="value">20</span>', rebuilt.body)
+
+    async def test_missing_map_is_404(self):
+        from fastapi import HTTPException
+
+        with self.assertRaises(HTTPException) as ctx:
+            await viewer.view_map("no_such_map", _request(), pose=None)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# tests/test_write_queue.py
+import asyncio
+import threading
+import unittest
+
+from storage.write_queue import BackgroundWriter
+
+
+class BackgroundWriterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_oserror_until_success(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OSError("disk busy")
+
+        writer = BackgroundWriter(num_workers=1, max_retries=3)
+        with self.assertLogs("storage.write_queue", level="WARNING"):
+            future = await writer.submit("s", flaky)
+            self.assertTrue(await future)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(await writer.drain("s"), 0)
+
+    async def test_reports_failure_after_max_retries(self):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise OSError("disk full")
+
+        writer = BackgroundWriter(num_workers=2, max_retries=3)
+        with self.assertLogs("storage.write_queue", level="ERROR"):
+            await writer.submit("s", broken)
+            await writer.submit("s", lambda: None)
+            self.assertEqual(await writer.drain("s"), 1)
+        self.assertEqual(len(calls), 3)
+        # drain 후에는 세션 추적이 비워짐
+        self.assertEqual(await writer.drain("s"), 0)
+
+    async def test_non_oserror_is_not_retried(self):
+        calls = []
+
+        def bad_input():
+            calls.append(1)
+            raise ValueError("cannot reshape")
+
+        writer = BackgroundWriter(num_workers=1)
+        with self.assertLogs("storage.write_queue", level="ERROR"):
+            future = await writer.submit("s", bad_input)
+            with self.assertRaises(ValueError):
+                await future
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(await writer.drain("s"), 1)
+
+    async def test_failures_are_tracked_per_session(self):
+        def broken():
+            raise ValueError("bad")
+
+        writer = BackgroundWriter(num_workers=1)
+        with self.assertLogs("storage.write_queue", level="ERROR"):
+            await writer.submit("a", broken)
+            await writer.submit("b", lambda: None)
+            self.assertEqual(await writer.drain("b"), 0)
+            self.assertEqual(await writer.drain("a"), 1)
+
+    async def test_cancelled_write_is_skipped_and_worker_survives(self):
+        release = threading.Event()
+        ran = []
+
+        writer = BackgroundWriter(num_workers=1)
+        # 첫 쓰기가 워커를 붙잡고 있는 동안 두 번째 요청을 취소
+        first = await writer.submit("s", release.wait)
+        cancelled = await writer.submit("s", lambda: ran.append("cancelled"))
+        cancelled.cancel()
+        release.set()
+        self.assertTrue(await first)
+
+        after = await writer.submit("s", lambda: ran.append("after"))
+        self.assertTrue(await asyncio.wait_for(after, timeout=5))
+        self.assertEqual(ran, ["after"])
+        # 취소된 쓰기는 기록되지 않았으므로 실패로 집계
+        self.assertEqual(await writer.drain("s"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+# utils/base64_codec.py
+"""Base64 decoding with an optional SIMD-accelerated backend.
+
+pybase64 (SSSE3/AVX2) decodes roughly an order of magnitude faster than the
+stdlib codec; fall back to base64 when it is not installed.
+"""
+import base64
+
+try:
+    import pybase64
+    _PYBASE64_AVAILABLE = True
+except ImportError:
+    _PYBASE64_AVAILABLE = False
+
+
+def b64decode(data) -> bytes:
+    """Decode base64 str/bytes (non-alphabet characters are discarded, like base64.b64decode)."""
+    if _PYBASE64_AVAILABLE:
+        return pybase64.b64decode(data, validate=False)
+    return base64.b64decode(data)
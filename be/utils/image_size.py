@@ -0,0 +1,99 @@
+# utils/image_size.py
+"""Header-only image dimension probe.
+
+Reads width/height straight from the JPEG SOF / PNG IHDR headers instead of
+setting up a Pillow decoder. JPEG EXIF orientation is honoured the same way
+ImageOps.exif_transpose would (orientations 5-8 swap width and height).
+"""
+import struct
+from typing import Optional, Tuple
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG), CC (DAC) do not
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Standalone markers without a length field
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD9)) | {0x01}
+
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+def _exif_orientation(segment: bytes) -> int:
+    """APP1 payload (starting at b'Exif\\0\\0') -> orientation (1 when absent)."""
+    tiff = segment[6:]
+    if len(tiff) < 8:
+        return 1
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return 1
+
+    ifd_offset = struct.unpack_from(endian + 'I', tiff, 4)[0]
+    if ifd_offset + 2 > len(tiff):
+        return 1
+    num_entries = struct.unpack_from(endian + 'H', tiff, ifd_offset)[0]
+    entry = ifd_offset + 2
+    for _ in range(num_entries):
+        if entry + 12 > len(tiff):
+            break
+        tag, = struct.unpack_from(endian + 'H', tiff, entry)
+        if tag == _EXIF_ORIENTATION_TAG:
+            return struct.unpack_from(endian + 'H', tiff, entry + 8)[0]
+        entry += 12
+    return 1
+
+
+def jpeg_header(buf: bytes) -> Optional[Tuple[int, int, int]]:
+    """JPEG -> (stored width, stored height, EXIF orientation) without decoding.
+
+    The size is as encoded in the SOF header, i.e. before orientation is
+    applied; orientation is 1 when there is no EXIF tag.
+    """
+    if buf[:2] != b'\xff\xd8':
+        return None
+    orientation = 1
+    i = 2
+    n = len(buf)
+    while i + 4 <= n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker == 0xDA:  # SOS: entropy-coded data follows, no SOF seen
+            return None
+
+        seg_len, = struct.unpack_from('>H', buf, i + 2)
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack_from('>HH', buf, i + 5)
+            return width, height, orientation
+        if marker == 0xE1 and buf[i + 4:i + 10] == b'Exif\x00\x00':
+            orientation = _exif_orientation(buf[i + 4:i + 2 + seg_len])
+        i += 2 + seg_len
+    return None
+
+
+def _jpeg_size(buf: bytes) -> Optional[Tuple[int, int]]:
+    """JPEG -> (width, height) from the SOF header, EXIF orientation applied."""
+    header = jpeg_header(buf)
+    if header is None:
+        return None
+    width, height, orientation = header
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    return width, height
+
+
+def image_size(buf: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) for JPEG/PNG bytes, or None when the format is not recognised."""
+    if buf[:2] == b'\xff\xd8':
+        return _jpeg_size(buf)
+    if buf[:8] == b'\x89PNG\r\n\x1a\n' and buf[12:16] == b'IHDR':
+        return struct.unpack_from('>II', buf, 16)
+    return None
@@ -96,7 +96,8 @@ class SLAMJobQueue:
             )
             logger.info(f"Copied input DB to {tmp_input} ({src.stat().st_size} bytes)")
 
-            parsed = await self.engine.database_parser.parse_database(str(tmp_input))
+            # 곧 삭제되는 임시 복사본이므로 파싱 캐시에 남기지 않음
+            parsed = await self.engine.database_parser.parse_database(str(tmp_input), use_cache=False)
             total_nodes = parsed.get('num_keyframes', 0)
             total_distance = _compute_trajectory_distance(parsed.get('keyframes', []))
 
@@ -122,9 +123,10 @@ class SLAMJobQueue:
                 building_id, session_db_pairs = await self.queue.get()
                 logger.info(f"Job dequeued: building_id={building_id}, sessions={len(session_db_pairs)}, remaining={self.queue.qsize()}")
                 
+                session_ids = [session_id for session_id, _ in session_db_pairs]
+                
                 try:
-                    for session_id, _ in session_db_pairs:
-                        await self.adapter.update_status(session_id, SCAN_STATUS_PROCESSING)
+                    await self.adapter.update_status_many(session_ids, SCAN_STATUS_PROCESSING)
                     
                     last_result = None
                     for session_id, input_db_path in session_db_pairs:
@@ -146,15 +148,13 @@ class SLAMJobQueue:
                         output_path.write_bytes(last_result['binary'])
                         logger.info(f"Building map saved: {output_path} ({len(last_result['binary'])} bytes)")
                     
-                    for session_id, _ in session_db_pairs:
-                        await self.adapter.update_status(session_id, SCAN_STATUS_COMPLETED)
+                    await self.adapter.update_status_many(session_ids, SCAN_STATUS_COMPLETED)
                     
                     logger.info(f"Building processing succeeded: building_id={building_id}")
                     
                 except Exception as e:
                     error_msg = f"{type(e).__name__}: {str(e)}"
-                    for session_id, _ in session_db_pairs:
-                        await self.adapter.update_status(session_id, SCAN_STATUS_FAILED, error_msg)
+                    await self.adapter.update_status_many(session_ids, SCAN_STATUS_FAILED, error_msg)
                     logger.error(f"Building processing failed: building_id={building_id}, error={error_msg}", exc_info=True)
                 
                 finally:
@@ -0,0 +1,25 @@
+# utils/trajectory.py
+"""Keyframe trajectory summary shared by map saving and the viewer."""
+from typing import Dict, List
+
+import numpy as np
+
+
+def trajectory_stats(keyframes: List[Dict]) -> tuple:
+    """키프레임 위치 -> (이동 거리, 중심 x/y/z, min_y, max_y, max_span)
+
+    위치 배열을 한 번만 만들어 거리/범위를 NumPy 로 한꺼번에 계산.
+    """
+    if not keyframes:
+        return 0.0, 0, 0, 0, 0, 0, 5
+
+    pos = np.asarray([kf['position'] for kf in keyframes], dtype=np.float64)
+    d = np.diff(pos, axis=0)
+    travelled = float(np.sqrt(np.einsum('ij,ij->i', d, d)).sum())
+
+    lo = pos.min(axis=0)
+    hi = pos.max(axis=0)
+    center_x, center_y, center_z = ((lo + hi) / 2).tolist()
+    span = hi - lo
+    max_span = max(float(span[0]), float(span[2]), 2)
+    return travelled, center_x, center_y, center_z, float(lo[1]), float(hi[1]), max_span